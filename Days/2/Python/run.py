@@ -1,32 +1,103 @@
 #!/usr/bin/env python3
+import os
 import sys
 import math
+import itertools
+# The shared Intcode engine lives in the root of the repository
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","..",".."))
+from intcode import data_parser, run_program, OPCODES
 #######################Helping functions###########################
-def data_parser(filepath):
+def intcode_runner(d):
     """
-    Parse the data by splitting the line by commas, and making input
-    to ints
+    See the input data as a tape, and move forward on the operations.
+    The tape is changed in place, like the program would change itself
     """
-    with open(filepath, 'r') as f:
-        return [int(x) for x in f.readline().split(",")]
+    d[:] = run_program(d,version=2).inspect_program()
+    return d[0]
 
-def intcode_runner(d):
+def symbolic_runner(d):
     """
-    See the input data as a tape, and move forward on the operations
+    Run the tape with the noun and verb as symbols. Every cell holds an
+    affine function c + x*noun + y*verb as the tuple (c,x,y), or None when
+    the value depends on the noun and verb in a way we do not track,
+    like reading through the noun as an address.
+    Returns the function for d[0], or None if it is not affine, or the
+    program runs into an opcode the engine would stop at
     """
+    e = [(x,0,0) for x in d]
+    e[1] = (0,1,0)
+    e[2] = (0,0,1)
     ptr = 0
     while True:
-        # Unpack the instruction and load/save registers
-        inst,a,b,ret = d[ptr:ptr+4]
-        if inst == 1:
-            d[ret] = d[a] + d[b]
-        elif inst == 2:
-            d[ret] = d[a] * d[b]
-        elif inst == 99:
+        inst = e[ptr]
+        if inst is None or inst[1:] != (0,0):
+            return None
+        inst = inst[0]
+        if inst not in OPCODES[2]:
+            return None
+        if inst == 99:
             break
-            pass
+        if inst in (1,2):
+            # The addresses have to be known, but the values do not
+            a,b,ret = e[ptr+1:ptr+4]
+            if ret is None or ret[1:] != (0,0):
+                return None
+            A = e[a[0]] if a is not None and a[1:] == (0,0) else None
+            B = e[b[0]] if b is not None and b[1:] == (0,0) else None
+            if A is None or B is None:
+                value = None
+            elif inst == 1:
+                value = tuple(x + y for x,y in zip(A,B))
+            elif A[1:] == (0,0):
+                value = tuple(A[0] * y for y in B)
+            elif B[1:] == (0,0):
+                value = tuple(B[0] * x for x in A)
+            else: # noun and verb multiplied together
+                return None
+            e[ret[0]] = value
         ptr += 4
-    return d[0]
+    return e[0]
+
+def noun_search(d,noun,target):
+    """
+    Bruteforce all verbs for a single noun, returns the verb hitting
+    the target, or None
+    """
+    for verb in range (100):
+        e = d.copy()
+        e[1] = noun
+        e[2] = verb
+        if intcode_runner(e) == target:
+            return verb
+    return None
+
+def parallel_search(d,target):
+    """
+    Bruteforce over the input space, with the nouns spread out over a
+    process pool
+    """
+    # Only needed for programs that are not affine, so only import it here
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor() as pool:
+        nouns = range(100)
+        verbs = pool.map(noun_search,itertools.repeat(d),nouns,itertools.repeat(target))
+        for noun,verb in zip(nouns,verbs):
+            if verb is not None:
+                return 100 * noun + verb
+
+def batch_search(d,target):
+    """
+    Run the whole input space at once, as lanes of a batch in lockstep.
+    Raises ImportError without NumPy
+    """
+    # NumPy is slow to import, and only needed for programs that are not
+    # affine, so only import it here
+    from intcode.batch import run_batch
+    nouns,verbs = zip(*itertools.product(range(100),range(100)))
+    _,memory = run_batch(d,[[]] * len(nouns),version=2,patches={1: nouns, 2: verbs})
+    for noun,verb,res in zip(nouns,verbs,memory[:,0]):
+        if res == target:
+            return 100 * noun + verb
 #########################Main functions############################
 def solver_1star(d):
     """
@@ -39,18 +110,27 @@ def solver_1star(d):
 
 def solver_2star(d):
     """
-    Iterate over the input space of range 0 to 100 in both varriables,
-    and bruteforce for the target
+    Run the program once symbolically, to get d[0] as c + x*noun + y*verb,
+    and solve for the target over the input space of range 0 to 100 in
+    both varriables. If the program is not linear, bruteforce for the target,
+    as one batch if we can
     """
     target = 19690720
+    function = symbolic_runner(d)
+    if function is None:
+        try:
+            return batch_search(d,target)
+        except ImportError: # NumPy is not installed, search with a process pool
+            return parallel_search(d,target)
+
+    c,x,y = function
     for noun in range(100):
-        for verb in range (100):
-            e = d.copy()
-            e[1] = noun
-            e[2] = verb
-            res = intcode_runner(e)
-            if res == target:
-                return 100 * noun + verb
+        rest = target - c - x * noun
+        if y == 0:
+            if rest == 0:
+                return 100 * noun
+        elif rest % y == 0 and 0 <= rest // y < 100:
+            return 100 * noun + rest // y
 ##############################MAIN#################################
 def main():
     """
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import sys
 import math
-import matplotlib.pyplot as plt
 from collections import namedtuple as t
 ######################Helping definitions##########################
 Point = t('Point', [
@@ -36,6 +35,8 @@ def plot_paths(line_list_list):
     """
     Plots a list of paths
     """
+    # Only needed here, and slow to import, so only import it when plotting
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots()
     for line_list in line_list_list:
         X = [x.point.x for x in line_list]
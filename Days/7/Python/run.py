@@ -1,323 +1,165 @@
 #!/usr/bin/env python3
+import os
 import sys
 import math
 import time
 import itertools
-import matplotlib.pyplot as plt
-from multiprocessing import Process, Queue, Value, Lock
+import functools
+# The shared Intcode engine lives in the root of the repository
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"..","..",".."))
+from intcode import data_parser, IntcodeMachine, Network, stream
+######################Helping definitions##########################
+# Signals each amplifier is probed with, to see if it is affine
+PROBES = (0,1,2,3,1000)
 #######################Helping functions###########################
-def data_parser(filepath):
+@functools.lru_cache(maxsize=4096)
+def amplifier(program,phase,signal):
     """
-    Parse the data by splitting the line by commas, and making input
-    to ints
+    Run a single amplifier without feedback, on the program given as a
+    tuple. The output only depends on the program, the phase and the input
+    signal, so the runs are cached
     """
-    with open(filepath, 'r') as f:
-        return [int(x) for x in f.readline().split(",")]
+    return next(stream(program,[phase,signal],version=5))
 
-class IntcodeProcess(Process):
+def best_chain(program,phases,signal,memo):
     """
-    The IntcodeProcess Is A multiprocess class
-    That have the ability to wait for input from a
-    queue(Get input), and dump to a queue (Set input),
-    And inspect the Intcode program when the process has halted
+    Best signal out of the phases left, run in any order from signal.
+    The permutations share their prefixes, and two prefixes ending in the
+    same signal with the same phases left have the same best ending, so
+    each of these is only solved once
     """
-    def __init__(self,name,program):
-        super().__init__()
-        self.name = name
-        self.output_queue = Queue()
-        self.input_queue = None
-        self.program = program
-        self.program_queue = Queue()
-        self.halted = Value('b', False)
-        self.running_lock = Lock()
-        self.reset_lock = Lock()
-        self.got_input_lock = Lock()
-        self.input_submitted = Lock()
-
-    def set_input_queue(self,queue):
-        """
-        Sets the input queue, so we can reference it from
-        an outside object
-        """
-        self.input_queue = queue
-
-    def shutdown(self):
-        self.reset()
-        self.halted.value = True
-        self.join()
-
-    def reset(self):
-        """
-        Stops and resets the processor if possible.
-        Clears the internal queues and resets the program
-        """
-        # IF not halted, send HALT to input and wait
-        # for halt
-        if not self.is_halted():
-            self.input_queue.put("HALT")
-            self.wait_for_halt()
-
-        # Clear the queues
-        while not self.output_queue.empty():
-            self.output_queue.get()
-        while not self.input_queue.empty():
-            self.input_queue.get()
-        while not self.program_queue.empty():
-            self.program_queue.get()
-
-        # Set the halted status, and release the lock to run
-        self.halted.value = False
-        self.reset_lock.release()
-
-    def wait_for_halt(self):
-        """
-        Will only pass if current program has halted, and needs reset
-        """
-        self.running_lock.acquire()
-        self.running_lock.release()
-
-    def is_halted(self):
-        """
-        Returns if the program is halted or not
-        """
-        return self.halted.value
-
-    def safe_insert_input(self,data):
-        """
-        Insert data safe into the process, and
-        detect if it has been gobbled up
-        """
-        self.got_input_lock.acquire()
-        self.input_queue.put(data)
-        self.input_submitted.acquire()
-        self.got_input_lock.release()
-        self.input_submitted.release()
-
-    def inspect_program(self):
-        """
-        Inspect the program after it has been halted
-        """
-        return self.program_queue.get()
-
-    def run(self):
-        """
-        Run the program
-        """
-        # Internal helping function
-        def get(mode,value):
-            """
-            Gets the data based on:
-            * mode 0: position          d[x]
-            * mode 1: intermediate      x
-            """
-            if mode == 0:
-                return program[value]
-            elif mode == 1:
-                return value
-
-        # Acquire the lock initially, since it is "inverse"
-        self.got_input_lock.acquire()
-        # Running loop
-        while True:
-            # Acquire the lock, so we know that we need to run
-            self.reset_lock.acquire()
-
-            # If the program already halted, we become ready to terminate
-            # No more running from this point!
-            if(self.is_halted()):
-                break
-
-            program = self.program.copy()
-            ptr = 0
-            self.running_lock.acquire()
-            while True:
-                # Unpack the instruction and load/save registers
-                # Append zeroes for default args
-                arg = "0000" + str(program[ptr])
-                inst = int(arg[-2]+arg[-1])
-                param = [int(d) for d in arg[:-2]]
-                param.reverse()
-
-                if inst == 1: # Add
-                    a,b,ret = program[ptr+1:ptr+4]
-                    A,B,_   = param[:3]
-                    program[ret] = get(A,a) + get(B,b)
-                    ptr += 4
-
-                elif inst == 2: # Multiply
-                    a,b,ret = program[ptr+1:ptr+4]
-                    A,B,_   = param[:3]
-                    program[ret] = get(A,a) * get(B,b)
-                    ptr += 4
-
-                elif inst == 3: # Get input. Special case, halt if string received("HALT")
-                    self.got_input_lock.release()
-                    self.input_submitted.acquire()
-
-                    ret = program[ptr+1]
-                    data = self.input_queue.get()
-                    program[ret] = data
-                    ptr += 2
-
-                    self.input_submitted.release()
-                    self.got_input_lock.acquire()
-
-                    # Halt program if Halt command is seen
-                    if data == "HALT":
-                        break
-
-                elif inst == 4: # Save output
-                    ret = program[ptr+1]
-                    RET = param[0]
-                    self.output_queue.put(get(RET,ret))
-                    ptr += 2
-
-                elif inst == 5: # Jump if true
-                    comp,ret = program[ptr+1:ptr+3]
-                    COMP,RET = param[:2]
-                    if get(COMP,comp) != 0:
-                        ptr = get(RET,ret)
-                    else:
-                        ptr += 3
-
-                elif inst == 6: # Jump if false
-                    comp,ret = program[ptr+1:ptr+3]
-                    COMP,RET = param[:2]
-                    if get(COMP,comp) == 0:
-                        ptr = get(RET,ret)
-                    else:
-                        ptr += 3
-
-                elif inst == 7: # less than
-                    a,b,ret = program[ptr+1:ptr+4]
-                    A,B,_   = param[:3]
-                    if get(A,a) < get(B,b):
-                        program[ret] = 1
-                    else:
-                        program[ret] = 0
-                    ptr += 4
-
-                elif inst == 8: # equals
-                    a,b,ret = program[ptr+1:ptr+4]
-                    A,B,_   = param[:3]
-                    if get(A,a) == get(B,b):
-                        program[ret] = 1
-                    else:
-                        program[ret] = 0
-                    ptr += 4
+    if not phases:
+        return signal
+    if (phases,signal) not in memo:
+        memo[(phases,signal)] = max(best_chain(program,phases - {phase},
+                                               amplifier(program,phase,signal),memo)
+                                    for phase in phases)
+    return memo[(phases,signal)]
+
+def transfer(program,phase):
+    """
+    Probe the transfer function of an amplifier. Returns (a, b) if it
+    behaves as signal -> a * signal + b on all of the probes, else None
+    """
+    b = amplifier(program,phase,0)
+    a = amplifier(program,phase,1) - b
+    if all(amplifier(program,phase,x) == a * x + b for x in PROBES):
+        return (a,b)
+    return None
 
-                elif inst == 99: # Halt
-                    break
+def upper_bound(transfers,phases,signal):
+    """
+    Bound on the signal out of the phases left. For affine amplifiers with
+    nonnegative slopes and intercepts, any order gives the product of the
+    slopes times the signal, plus each intercept times the slopes after it.
+    Those are at most all the other slopes, counting slopes below 1 as 1
+    """
+    ret = math.prod(transfers[phase][0] for phase in phases) * signal
+    for phase in phases:
+        ret += transfers[phase][1] * math.prod(max(transfers[other][0],1)
+                                               for other in phases if other != phase)
+    return ret
 
-                else: # Undefined inst, terminate
-                    break
+def branch_and_bound(program,phases,signal,transfers,best=0):
+    """
+    Best signal out of the phases left, searching the orders depth first
+    and cutting every branch whose upper bound can not beat the best so
+    far. Of two affine amplifiers, p goes before q if b_p*(a_q-1) is the
+    larger of b_p*(a_q-1) and b_q*(a_p-1), the branches are tried in that
+    order, so the first order found is usually the best one already.
+    Returns the best of the signals found and best
+    """
+    if not phases:
+        return max(signal,best)
+    if upper_bound(transfers,phases,signal) <= best:
+        return best
 
-            # Save the program after it halted, and set halting status
-            self.halted.value = True
-            self.running_lock.release()
-            self.program_queue.put(program)
+    def before(p,q):
+        (a_p,b_p),(a_q,b_q) = transfers[p],transfers[q]
+        return b_q * (a_p - 1) - b_p * (a_q - 1)
 
+    for phase in sorted(phases,key=functools.cmp_to_key(before)):
+        best = branch_and_bound(program,phases - {phase},amplifier(program,phase,signal),
+                                transfers,best)
+    return best
 
-#########################Main functions############################
-def solver_1star(d):
+def amplifier_chain(d,permutations):
     """
-    Generate all permutations of the phases, and bruteforce
-    The functions seems to be linear, so there may be a way to find the
-    max without bruteforce
+    Wire the machines in a feedback loop, and run every phase permutation
+    through them until all have halted. The last output of the last
+    machine is then left in the queue of the first one. Returns the best
+    signal seen
     """
-    # Setup the Intcode processes
-    input_queue = Queue()
-    p1 = IntcodeProcess("Process 1",d.copy())
-    p2 = IntcodeProcess("Process 2",d.copy())
-    p3 = IntcodeProcess("Process 3",d.copy())
-    p4 = IntcodeProcess("Process 4",d.copy())
-    p5 = IntcodeProcess("Process 5",d.copy())
-    p1.set_input_queue(input_queue)
-    p2.set_input_queue(p1.output_queue)
-    p3.set_input_queue(p2.output_queue)
-    p4.set_input_queue(p3.output_queue)
-    p5.set_input_queue(p4.output_queue)
-    process = [p1,p2,p3,p4,p5]
-    output_queue = p5.output_queue
+    # Feed each phase to a machine once, and fork the permutations
+    # off these, instead of replaying the phase input every time
+    primed = dict()
+    for phase in set(itertools.chain(*permutations)):
+        primed[phase] = IntcodeMachine(f"Phase {phase}",d,version=5)
+        primed[phase].safe_insert_input(phase)
 
-    # Start the threads
-    [p.start() for p in process]
-
-    permutations = itertools.permutations([0,1,2,3,4])
     max_signal = 0
     for permutation in permutations:
-        # Load the phases
-        for p,phase in zip(process,permutation):
-            p.safe_insert_input(phase)
-
-        # Insert the value
-        p1.safe_insert_input(0)
+        # Setup the Intcode machines, in a ring
+        network = Network()
+        names = [f"Machine {i}" for i in range(1,len(permutation)+1)]
+        for name,phase in zip(names,permutation):
+            network.add(name,primed[phase].fork(name))
+        for source,target in zip(names,names[1:] + names[:1]):
+            network.connect(source,target)
 
-        # Get the output
-        signal = output_queue.get()
+        # Insert the value, and wait for all machines to halt
+        network.send(names[0],0)
+        network.wait_for_halt()
 
-        # Reset the treads
-        [p.reset() for p in process]
+        # Get the output, left for the first machine
+        signal = network.nodes[names[0]].input_queue.popleft()
 
         # Compare if this is better
         if signal > max_signal:
             max_signal = signal
 
-    # Stop the treads
-    [p.shutdown() for p in process]
-
     return max_signal
 
-def solver_2star(d):
+def max_thruster_signal(d,phases,workers=1):
     """
-    Do nearly the same as the other star, but wait for all prosesses to halt,
-    and wire them in a loop
+    Find the best signal over all permutations of the phases.
+    Every permutation is independent, so with more than one worker they are
+    dealt out over a process pool, where each worker runs its own chain.
+    workers=None uses one worker per core
     """
-    # Setup the Intcode processes
-    p1 = IntcodeProcess("Process 1",d.copy())
-    p2 = IntcodeProcess("Process 2",d.copy())
-    p3 = IntcodeProcess("Process 3",d.copy())
-    p4 = IntcodeProcess("Process 4",d.copy())
-    p5 = IntcodeProcess("Process 5",d.copy())
-    p1.set_input_queue(p5.output_queue)
-    p2.set_input_queue(p1.output_queue)
-    p3.set_input_queue(p2.output_queue)
-    p4.set_input_queue(p3.output_queue)
-    p5.set_input_queue(p4.output_queue)
-    process = [p1,p2,p3,p4,p5]
-    output_queue = p5.output_queue
-    input_queue = p1.input_queue
-
-    # Start the threads
-    [p.start() for p in process]
-
-    permutations = itertools.permutations([5,6,7,8,9])
-    max_signal = 0
-    for permutation in permutations:
-        # Load the phases
-        for p,phase in zip(process,permutation):
-            p.safe_insert_input(phase)
-
-        # Insert the value
-        p1.safe_insert_input(0)
-
-        # Wait for all processes to halt
-        [p.wait_for_halt() for p in process]
-
-        # Get the output
-        signal = output_queue.get()
-
-        # Reset the treads
-        [p.reset() for p in process]
-
-        # Compare if this is better
-        if signal > max_signal:
-            max_signal = signal
-
-    # Stop the treads
-    [p.shutdown() for p in process]
-
-    return max_signal
+    permutations = list(itertools.permutations(phases))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        return amplifier_chain(d,permutations)
+
+    # Only needed with more than one worker, and slow to import, so only
+    # import it here
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = [permutations[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return max(pool.map(amplifier_chain,itertools.repeat(d),chunks))
+#########################Main functions############################
+def solver_1star(d):
+    """
+    The amplifiers seem to be affine. If probing them agrees, search the
+    orders of the phases with branch and bound, else as a DP over the
+    prefixes
+    """
+    # Hashable, so the amplifier cache can be keyed by it
+    program = tuple(d)
+    phases = frozenset([0,1,2,3,4])
+    transfers = {phase: transfer(program,phase) for phase in phases}
+    if all(t is not None and min(t) >= 0 for t in transfers.values()):
+        return branch_and_bound(program,phases,0,transfers)
+    return best_chain(program,phases,0,dict())
+
+def solver_2star(d,workers=1):
+    """
+    Do nearly the same as the other star, but the machines are now wired in
+    a feedback loop, and keep running until all have halted
+    """
+    return max_thruster_signal(d,[5,6,7,8,9],workers)
 ##############################MAIN#################################
 def main():
     """
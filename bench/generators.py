@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Synthetic inputs in the format of each day, to see how the solvers scale.
+Every generator takes a size and a seed, and returns the text of an input
+file, the same text for the same arguments
+"""
+import random
+import string
+#######################Helping functions###########################
+def day1(size,seed=0):
+    """
+    size module masses, one per line
+    """
+    rng = random.Random(seed)
+    return "\n".join(str(rng.randint(50000,150000)) for _ in range(size)) + "\n"
+
+def day3(size,seed=0):
+    """
+    Two wires of size segments each, turning at every segment. The first
+    segments cross at (10,5), so there is always an intersection
+    """
+    rng = random.Random(seed)
+    wires = []
+    for start in (["R10","U10"],["U5","R20"]):
+        wire = list(start)
+        while len(wire) < size:
+            # Alternate between vertical and horizontal segments
+            directions = "UD" if wire[-1][0] in "LR" else "LR"
+            wire.append(f"{rng.choice(directions)}{rng.randint(1,1000)}")
+        wires.append(",".join(wire[:size]))
+    return "\n".join(wires) + "\n"
+
+def day4(size,seed=0):
+    """
+    A range of size numbers, from a six digit one. Wide ranges run into
+    numbers with more digits
+    """
+    rng = random.Random(seed)
+    start = rng.randint(100000,999999)
+    return f"{start}-{start + size}\n"
+
+def base36(number):
+    """
+    Returns the number in base 36, as a unique body name
+    """
+    digits = string.digits + string.ascii_uppercase
+    ret = digits[number % 36]
+    while number >= 36:
+        number //= 36
+        ret = digits[number % 36] + ret
+    return ret
+
+def day6(size,seed=0):
+    """
+    An orbit map of size bodies around COM, each orbiting a random body
+    before it, with YOU and SAN orbiting two of them
+    """
+    rng = random.Random(seed)
+    names = ["COM"]
+    lines = []
+    counter = 0
+    while len(names) < size:
+        name = base36(counter)
+        counter += 1
+        if name in ("COM","YOU","SAN"):
+            continue
+        lines.append(f"{rng.choice(names)}){name}")
+        names.append(name)
+    lines.append(f"{rng.choice(names)})YOU")
+    lines.append(f"{rng.choice(names)})SAN")
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n"
+
+def day8(size,seed=0):
+    """
+    An image of size layers of 25x6 pixels, with the last layer
+    fully opaque. On a single line without a newline, like the input
+    """
+    rng = random.Random(seed)
+    pixels = [rng.choice("012") for _ in range(25 * 6 * (size - 1))]
+    pixels += [rng.choice("01") for _ in range(25 * 6)]
+    return "".join(pixels)
+
+def intcode_loop(size,seed=0):
+    """
+    Intcode program reading a value, and adding it up size times in a loop,
+    before writing out the sum. Runs as Day 5 and Day 9
+    """
+    size = max(size,1)
+    X,C,A = 20,21,22
+    program = [3,X,              # X = input
+               1101,0,size,C,    # C = size
+               1,A,X,A,          # loop: A += X
+               1001,C,-1,C,      #       C -= 1
+               1005,C,6,         #       if C: goto loop
+               4,A,              # output A
+               99,
+               0,0,0]
+    return ",".join(map(str,program)) + "\n"
+
+def intcode_amplifier(size,seed=0):
+    """
+    Intcode amplifier reading its phase, then for 10 rounds reading a
+    signal and writing signal + size * phase, adding up in a loop. The
+    first output is all Day 7 star 1 uses, and the rounds feed star 2
+    """
+    size = max(size,1)
+    P,R,S,C = 33,34,35,36
+    program = [3,P,              # P = phase
+               1101,0,10,R,      # R = 10 rounds
+               3,S,              # round: S = input
+               1101,0,size,C,    #        C = size
+               1,S,P,S,          #        loop: S += P
+               1001,C,-1,C,      #              C -= 1
+               1005,C,12,        #              if C: goto loop
+               4,S,              #        output S
+               1001,R,-1,R,      #        R -= 1
+               1005,R,6,         #        if R: goto round
+               99,
+               0,0,0,0]
+    return ",".join(map(str,program)) + "\n"
+######################Helping definitions##########################
+# The generator of each day, and the sizes swept by default
+GENERATORS = {
+    1: (day1,[1000,10000,100000,1000000]),
+    3: (day3,[100,200,400,800]),
+    4: (day4,[10000,100000,1000000]),
+    5: (intcode_loop,[1000,10000,100000]),
+    6: (day6,[100,200,400,800]),
+    7: (intcode_amplifier,[10,30,100,300]),
+    8: (day8,[100,1000,10000]),
+    9: (intcode_loop,[1000,10000,100000])
+}
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import os
+import sys
+import glob
+import time
+import tarfile
+import argparse
+import tempfile
+import statistics
+import subprocess
+#######################Helping functions###########################
+def days(root):
+    """
+    Returns the days with a Python solution in the tree, as (day, folder)
+    """
+    ret = []
+    for folder in glob.glob(os.path.join(root,"Days","*","Python")):
+        day = os.path.basename(os.path.dirname(folder))
+        if day.isdigit() and os.path.exists(os.path.join(folder,"run.py")):
+            ret.append((int(day),folder))
+    return sorted(ret)
+
+def cold_start(folder,repeats):
+    """
+    Time a fresh interpreter importing the run.py of a day, without
+    running the solvers. Returns the times of every repeat in seconds
+    """
+    ret = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable,"-c","import run"],cwd=folder,check=True)
+        ret.append(time.perf_counter() - start)
+    return ret
+
+def export(root,ref,target):
+    """
+    Extract the tree of a git ref into target, and returns the path of it
+    """
+    archive = subprocess.run(["git","archive","--format=tar",ref],cwd=root,
+                             check=True,capture_output=True).stdout
+    path = os.path.join(target,"tree")
+    with tempfile.TemporaryFile() as f:
+        f.write(archive)
+        f.seek(0)
+        with tarfile.open(fileobj=f) as tar:
+            tar.extractall(path)
+    return path
+##############################MAIN#################################
+def main():
+    """
+    Print the cold start time of every day, the import of run.py in a fresh
+    interpreter, as paid by every invocation of a run.py by itself. With
+    --ref the same is measured on another commit, to compare before and after
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--ref",help="git ref to compare against, like HEAD~1")
+    parser.add_argument("--repeats",type=int,default=5,help="runs per day, the best is shown")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as target:
+        trees = [("now",root)]
+        if args.ref is not None:
+            trees.insert(0,(args.ref,export(root,args.ref,target)))
+
+        results = dict()
+        for name,tree in trees:
+            for day,folder in days(tree):
+                times = cold_start(folder,args.repeats)
+                results.setdefault(day,dict())[name] = (min(times),statistics.median(times))
+
+    header = "".join(f"{name:>22}" for name,_ in trees)
+    print(f"Day{header}")
+    for day,result in sorted(results.items()):
+        columns = ""
+        for name,_ in trees:
+            if name in result:
+                best,median = result[name]
+                columns += f"{best*1000:>10.1f}ms ({median*1000:>6.1f})"
+            else:
+                columns += f"{'-':>22}"
+        print(f"{day:<3}{columns}")
+    print(f"Best of {args.repeats} runs, median in parentheses")
+
+if __name__ == "__main__":
+    main()
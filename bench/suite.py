@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+import os
+import sys
+import copy
+import math
+import time
+import inspect
+import tempfile
+import sqlite3
+import argparse
+import statistics
+import subprocess
+# The runner in the root of the repository knows how to find and load days
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+from test import load_day, find_days
+from generators import GENERATORS
+######################Helping definitions##########################
+STAGES = ("data_parser","solver_1star","solver_2star")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timings (
+    commit_id TEXT,
+    dirty INTEGER,
+    created REAL,
+    day INTEGER,
+    stage TEXT,
+    best REAL,
+    median REAL,
+    repeats INTEGER
+)
+"""
+#######################Helping functions###########################
+def git_commit():
+    """
+    Returns the commit of the tree, and if it has uncommitted changes
+    """
+    commit = subprocess.run(["git","rev-parse","HEAD"],cwd=ROOT,check=True,
+                            capture_output=True,text=True).stdout.strip()
+    status = subprocess.run(["git","status","--porcelain","--untracked-files=no"],cwd=ROOT,
+                            check=True,capture_output=True,text=True).stdout
+    return commit,bool(status.strip())
+
+def clear_caches(module):
+    """
+    Empty every lru_cache of a day, so each repeat does all of the work
+    """
+    for value in vars(module).values():
+        if callable(getattr(value,"cache_clear",None)):
+            value.cache_clear()
+
+def time_stage(module,function,make_argument,warmup,repeats):
+    """
+    Time function on a fresh argument per call. The warmup calls are not
+    counted. Returns the times of the repeats in seconds
+    """
+    ret = []
+    for i in range(warmup + repeats):
+        argument = make_argument()
+        clear_caches(module)
+        start = time.perf_counter()
+        function(argument)
+        if i >= warmup:
+            ret.append(time.perf_counter() - start)
+    return ret
+
+def bench_day(day,folder,warmup,repeats,path=None):
+    """
+    Time the parser and both solvers of a day, on the input of the day or
+    the file given. Returns stage -> times
+    """
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        module = load_day(day,folder)
+        path = path or os.path.join(folder,"..","input1.txt")
+        def parse(path):
+            # Make list, since the generator has to be used multiple times
+            d = module.data_parser(path)
+            return list(d) if inspect.isgenerator(d) else d
+        ret = {"data_parser": time_stage(module,parse,lambda: path,warmup,repeats)}
+        d = parse(path)
+        for stage in STAGES[1:]:
+            ret[stage] = time_stage(module,getattr(module,stage),lambda: copy.deepcopy(d),
+                                    warmup,repeats)
+    finally:
+        os.chdir(cwd)
+    return ret
+
+def baseline(db,commit,ref=None):
+    """
+    Returns (day, stage) -> best time of the baseline: the commit of ref if
+    given, else the latest commit measured before this one
+    """
+    if ref is not None:
+        base = subprocess.run(["git","rev-parse",ref],cwd=ROOT,check=True,
+                              capture_output=True,text=True).stdout.strip()
+    else:
+        row = db.execute("SELECT commit_id FROM timings WHERE commit_id != ? AND dirty = 0 "
+                         "ORDER BY created DESC LIMIT 1",(commit,)).fetchone()
+        if row is None:
+            return None,dict()
+        base = row[0]
+    rows = db.execute("SELECT day, stage, MIN(best) FROM timings WHERE commit_id = ? "
+                      "GROUP BY day, stage",(base,)).fetchall()
+    return base,{(day,stage): best for day,stage,best in rows}
+
+def sweep(days,scale,limit,plot):
+    """
+    Time every day with a generator on synthetic inputs of growing size,
+    and print the time of each stage with the exponent k of the growth
+    from the size before, time ~ size^k. A day stops growing once a stage
+    took longer than limit seconds. With plot, the curves are also drawn
+    on log-log axes into that file, which needs matplotlib
+    """
+    curves = dict()
+    print(f"{'Day':<4}{'stage':<14}{'size':>10}{'time':>10}{'k':>7}")
+    with tempfile.TemporaryDirectory() as target:
+        for day,folder,language in find_days(days):
+            if language != "Python" or day not in GENERATORS:
+                continue
+            generator,sizes = GENERATORS[day]
+            for size in (int(size * scale) for size in sizes):
+                path = os.path.join(target,f"day{day}_{size}.txt")
+                with open(path,"w") as f:
+                    f.write(generator(size))
+                times = bench_day(day,folder,0,1,path)
+                for stage,(elapsed,) in times.items():
+                    curve = curves.setdefault((day,stage),[])
+                    k = ""
+                    if curve and curve[-1][1] > 0 and elapsed > 0:
+                        k = f"{math.log(elapsed / curve[-1][1]) / math.log(size / curve[-1][0]):.2f}"
+                    curve.append((size,elapsed))
+                    print(f"{day:<4}{stage:<14}{size:>10}{elapsed:>10.4f}{k:>7}")
+                if max(elapsed for elapsed, in times.values()) > limit:
+                    break
+
+    if plot is not None:
+        # Only needed here, and slow to import, so only import it when plotting
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+        except ImportError:
+            print("Plotting needs matplotlib, skipped")
+            return
+        fig, ax = plt.subplots()
+        for (day,stage),curve in curves.items():
+            ax.loglog(*zip(*curve),marker="o",label=f"Day {day} {stage}")
+        ax.set_xlabel("input size")
+        ax.set_ylabel("seconds")
+        ax.grid()
+        ax.legend(fontsize="small")
+        fig.savefig(plot)
+
+##############################MAIN#################################
+def main():
+    """
+    Benchmark the parser and solvers of every day, store the timings in a
+    SQLite history by git commit, and flag the stages slower than the
+    baseline by more than the threshold
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("days",nargs="*",type=int,default=range(1,26),help="days to benchmark")
+    parser.add_argument("--warmup",type=int,default=1,help="calls per stage not counted")
+    parser.add_argument("--repeats",type=int,default=3,help="calls per stage counted")
+    parser.add_argument("--threshold",type=float,default=0.10,help="slowdown flagged, 0.10 is 10%%")
+    parser.add_argument("--noise",type=float,default=0.001,help="slowdowns below this in seconds are ignored")
+    parser.add_argument("--baseline",help="git ref to compare against, the last commit measured by default")
+    parser.add_argument("--db",default=os.path.join(ROOT,"bench","history.sqlite"),help="history database")
+    parser.add_argument("--no-save",action="store_true",help="do not store this run")
+    parser.add_argument("--sweep",action="store_true",help="time synthetic inputs of growing size instead")
+    parser.add_argument("--scale",type=float,default=1,help="multiplies the sizes swept")
+    parser.add_argument("--limit",type=float,default=10,help="seconds a stage may take before a sweep stops")
+    parser.add_argument("--plot",help="image file for the complexity curves of a sweep, needs matplotlib")
+    args = parser.parse_args()
+
+    if args.sweep:
+        sweep(args.days,args.scale,args.limit,args.plot)
+        return True
+
+    commit,dirty = git_commit()
+    db = sqlite3.connect(args.db)
+    db.execute(SCHEMA)
+    base,previous = baseline(db,commit,args.baseline)
+
+    print(f"Commit {commit[:10]}{' (dirty)' if dirty else ''}, "
+          f"baseline {base[:10] if base else 'none'}")
+    print(f"{'Day':<4}{'stage':<14}{'best':>10}{'median':>10}{'baseline':>10}{'change':>9}")
+    regressions = []
+    created = time.time()
+    for day,folder,language in find_days(args.days):
+        if language != "Python":
+            continue
+        for stage,times in bench_day(day,folder,args.warmup,args.repeats).items():
+            best,median = min(times),statistics.median(times)
+            old = previous.get((day,stage))
+            change,flag = "",""
+            if old is not None:
+                change = f"{(best - old) / old * 100 if old else 0:+.1f}%"
+                if best > old * (1 + args.threshold) and best - old > args.noise:
+                    flag = "  REGRESSION"
+                    regressions.append((day,stage))
+            print(f"{day:<4}{stage:<14}{best:>10.4f}{median:>10.4f}"
+                  f"{old if old is not None else float('nan'):>10.4f}{change:>9}{flag}")
+            if not args.no_save:
+                db.execute("INSERT INTO timings VALUES (?,?,?,?,?,?,?,?)",
+                           (commit,int(dirty),created,day,stage,best,median,args.repeats))
+    db.commit()
+    db.close()
+
+    if regressions:
+        print(f"{len(regressions)} stages slower than the baseline by more than "
+              f"{args.threshold:.0%}: " + ", ".join(f"day {d} {s}" for d,s in regressions))
+    return not regressions
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,27 @@
+"""
+Shared Intcode engine, used by every day running Intcode programs
+"""
+import importlib
+from .parser import data_parser
+from .opcodes import OPCODES, LATEST
+from .memory import Memory
+from .machine import MachineState, IntcodeMachine, run_until_halted, run_program, stream
+from .profile import Profile
+from .analysis import Analysis, analyze
+from .trace import Trace, Replay
+from .network import Network
+######################Helping definitions##########################
+# Running machines in other processes needs multiprocessing, which is slow
+# to import and used by no day, so these are only imported on first use
+LAZY = {"RingChannel": "channel",
+        "IntcodeProcess": "process",
+        "IntcodePool": "pool",
+        "program_id": "pool"}
+#######################Helping functions###########################
+def __getattr__(name):
+    """
+    Import the lazy names of the package on first use
+    """
+    if name not in LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{LAZY[name]}",__name__),name)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import json
+import argparse
+from .parser import data_parser
+from .machine import run_program
+from .analysis import analyze
+from .trace import Trace, Replay
+from .opcodes import LATEST
+#######################Helping functions###########################
+def profile(args):
+    """
+    Profile a program with the inputs given, and dump the counters
+    """
+    machine = run_program(data_parser(args.program),args.inputs,args.version,profile=True)
+    if args.folded:
+        print(machine.profile.to_folded(machine.name))
+    else:
+        print(machine.profile.to_json())
+
+def analysis(args):
+    """
+    Analyze a program without running it, and dump the summary
+    """
+    print(json.dumps(analyze(list(data_parser(args.program)),args.version).summary(),indent=2))
+
+def trace(args):
+    """
+    Run a program with the inputs given, and save the trace of it
+    """
+    machine = run_program(data_parser(args.program),args.inputs,args.version,trace=True)
+    machine.trace.save(args.out)
+    print(f"{len(machine.trace)} steps, {len(machine.trace.data)} bytes, written to {args.out}")
+
+def replay(args):
+    """
+    Seek a saved trace to a step, and dump the state there
+    """
+    state = Replay(Trace.load(args.trace)).seek(args.step)
+    print(json.dumps({
+        "step": state.step,
+        "ptr": state.ptr,
+        "opcode": state.inst,
+        "relative_base": state.relative_base,
+        "memory": {str(address): state.memory[address] for address in args.cells}
+    },indent=2))
+
+##############################MAIN#################################
+def main():
+    """
+    Tools for Intcode programs, run as python3 -m intcode <tool>
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m intcode")
+    tools = parser.add_subparsers(dest="tool",required=True)
+
+    tool = tools.add_parser("profile",help="profile a program")
+    tool.add_argument("program",help="file with the comma separated program")
+    tool.add_argument("inputs",nargs="*",type=int,help="input values")
+    tool.add_argument("--version",type=int,default=LATEST,help="opcode version")
+    tool.add_argument("--folded",action="store_true",help="dump folded stacks instead of JSON")
+    tool.set_defaults(run=profile)
+
+    tool = tools.add_parser("analyze",help="find the code, jumps and self modifying writes")
+    tool.add_argument("program",help="file with the comma separated program")
+    tool.add_argument("--version",type=int,default=LATEST,help="opcode version")
+    tool.set_defaults(run=analysis)
+
+    tool = tools.add_parser("trace",help="record the trace of a program")
+    tool.add_argument("program",help="file with the comma separated program")
+    tool.add_argument("inputs",nargs="*",type=int,help="input values")
+    tool.add_argument("--version",type=int,default=LATEST,help="opcode version")
+    tool.add_argument("--out",default="intcode.trace",help="file to write the trace to")
+    tool.set_defaults(run=trace)
+
+    tool = tools.add_parser("replay",help="replay a recorded trace up to a step")
+    tool.add_argument("trace",help="file with the trace")
+    tool.add_argument("step",type=int,help="step to seek to")
+    tool.add_argument("cells",nargs="*",type=int,help="memory cells to dump")
+    tool.set_defaults(run=replay)
+
+    args = parser.parse_args()
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
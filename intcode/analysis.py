@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+from .opcodes import OPCODES, LATEST, HALT, JUMP_IF_TRUE, JUMP_IF_FALSE
+######################Helping definitions##########################
+# The operand each writing instruction writes to
+WRITE_OPERAND = {1: 2, 2: 2, 3: 0, 7: 2, 8: 2}
+#######################Helping classes#############################
+class Analysis:
+    """
+    What is known about a program without running it, see analyze.
+    * instructions: reachable address -> (opcode, modes, operand count)
+    * successors:   reachable address -> addresses control can go to next
+    * code:         every cell of a reachable instruction, operands too
+    * writes:       address -> instructions writing to it, for the writes
+                    with a position mode target
+    * relative:     instructions writing to a relative mode target
+    * indirect:     jumps to a target only known at runtime
+    * unknown:      addresses control reaches, holding no instruction in
+                    the image, but written to before they run
+    """
+    def __init__(self):
+        self.instructions = dict()
+        self.successors = dict()
+        self.code = set()
+        self.writes = dict()
+        self.relative = set()
+        self.indirect = set()
+        self.unknown = set()
+
+    @property
+    def complete(self):
+        """
+        If every jump target and instruction is known, so no other code
+        can be reached
+        """
+        return not self.indirect and not self.unknown
+
+    @property
+    def self_modifying(self):
+        """
+        Returns the code cells that reachable instructions write to
+        """
+        return {address for address in self.writes if address in self.code}
+
+    def dead(self,program):
+        """
+        Returns the cells of the image never reached as code, the data and
+        any dead code. Only certain if the analysis is complete
+        """
+        return [address for address in range(len(program)) if address not in self.code]
+
+    def basic_blocks(self):
+        """
+        Returns the straight line runs of instructions, start -> addresses.
+        A block starts at the entry, at jump targets and after jumps
+        """
+        leaders = {0}
+        for ptr,(inst,_,_) in self.instructions.items():
+            if inst in (JUMP_IF_TRUE,JUMP_IF_FALSE):
+                leaders.update(self.successors[ptr])
+        ret = dict()
+        for start in sorted(leaders):
+            if start not in self.instructions:
+                continue
+            block = ret[start] = [start]
+            ptr = start
+            while self.instructions[ptr][0] not in (JUMP_IF_TRUE,JUMP_IF_FALSE):
+                following = self.successors[ptr]
+                if not following or following[0] in leaders or following[0] not in self.instructions:
+                    break
+                ptr = following[0]
+                block.append(ptr)
+        return ret
+
+    def summary(self):
+        return {
+            "instructions": len(self.instructions),
+            "code_cells": len(self.code),
+            "basic_blocks": len(self.basic_blocks()),
+            "complete": self.complete,
+            "indirect_jumps": sorted(self.indirect),
+            "unknown_code": sorted(self.unknown),
+            "relative_writes": sorted(self.relative),
+            "self_modifying": sorted(self.self_modifying)
+        }
+#######################Helping functions###########################
+def analyze(program,version=LATEST):
+    """
+    Recovers the control flow of a program from its image. Instructions
+    are followed from address 0, through both ways of every jump with an
+    intermediate target. Jumps reading their target from memory are
+    recorded as indirect, and not followed. Undefined opcodes, and running
+    off the image, end a path like a halt does
+    """
+    opcodes = OPCODES[version]
+    analysis = Analysis()
+    stops = set()
+    todo = [0]
+    while todo:
+        ptr = todo.pop()
+        if ptr in analysis.instructions or not 0 <= ptr < len(program):
+            continue
+        value = program[ptr]
+        inst = value % 100
+        if inst not in opcodes:
+            stops.add(ptr)
+            continue
+        modes = ((value // 100) % 10,(value // 1000) % 10,(value // 10000) % 10)
+        count = opcodes[inst][1]
+        operands = program[ptr+1:ptr+1+count]
+        analysis.instructions[ptr] = (inst,modes,count)
+        analysis.code.update(range(ptr,ptr+count+1))
+
+        if inst == HALT:
+            successors = ()
+        elif inst in (JUMP_IF_TRUE,JUMP_IF_FALSE):
+            successors = (ptr+3,)
+            if modes[1] == 1 and len(operands) == 2:
+                successors += (operands[1],)
+            else:
+                analysis.indirect.add(ptr)
+        else:
+            successors = (ptr+count+1,)
+        analysis.successors[ptr] = successors
+        todo.extend(successors)
+
+        if inst in WRITE_OPERAND and len(operands) == count:
+            mode = modes[WRITE_OPERAND[inst]]
+            target = operands[WRITE_OPERAND[inst]]
+            if mode == 0:
+                analysis.writes.setdefault(target,set()).add(ptr)
+            elif mode == 2:
+                analysis.relative.add(ptr)
+
+    # Code written before it runs can not be decoded from the image
+    analysis.unknown = {ptr for ptr in stops if ptr in analysis.writes}
+    return analysis
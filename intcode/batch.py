@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Batched Intcode runner, needs NumPy. Not imported by the intcode package
+itself, import it as intcode.batch where NumPy is around
+"""
+import numpy as np
+from .opcodes import OPCODES, LATEST, HALT
+#######################Helping functions###########################
+def run_batch(program,inputs,version=LATEST,patches=None,extra_memory=0):
+    """
+    Run one program over many lanes in lockstep, one lane per input list.
+    The memory is a lanes x cells int64 array, and lanes sharing a program
+    pointer run each instruction as one vectorized operation. Lanes only
+    split where the instruction or a jump target differs between them, and
+    merge again when they meet at the same address.
+    * patches maps addresses to one value per lane, set before running,
+      like the noun and verb of Day 2
+    * extra_memory adds zeroed cells past the program, the memory of a
+      batch does not grow by itself
+    Arithmetic not fitting in an int64 raises OverflowError.
+    Returns the outputs of each lane, and the memory array
+    """
+    opcodes = OPCODES[version]
+    lanes = len(inputs)
+    memory = np.zeros((lanes,len(program) + extra_memory),dtype=np.int64)
+    memory[:,:len(program)] = program
+    for address,values in (patches or dict()).items():
+        memory[:,address] = values
+    outputs = [[] for _ in range(lanes)]
+    cursor = [0] * lanes
+
+    # Internal helping functions
+    def get(mode,argument,group,relative_base):
+        """
+        Gets the data based on:
+        * mode 0: position          d[x]
+        * mode 1: intermediate      x
+        * mode 2: relative          d[x + relative_base]
+        """
+        if mode == 0:
+            return memory[group,argument]
+        elif mode == 1:
+            return argument
+        elif mode == 2:
+            return memory[group,argument+relative_base]
+
+    def put(mode,argument,group,relative_base,value):
+        """
+        Puts the data based on the mode
+        """
+        if mode == 0:
+            memory[group,argument] = value
+        elif mode == 2:
+            memory[group,argument+relative_base] = value
+        else:
+            raise RuntimeError(f"Write in mode {mode}")
+
+    def checked(value,estimate):
+        """
+        Returns the int64 value, if the float estimate says it did not wrap
+        """
+        if np.any(np.abs(estimate) >= 2.0**63):
+            raise OverflowError("Intcode value does not fit in an int64")
+        return value
+
+    def step(value,ptr,group,relative_base):
+        """
+        Run a single instruction for a group of lanes agreeing on it, and
+        returns a list of (ptr, group, relative_base) to continue with
+        """
+        inst = value % 100
+        A,B,C = (value // 100) % 10, (value // 1000) % 10, (value // 10000) % 10
+        if inst not in opcodes or inst == HALT:
+            return []
+        count = opcodes[inst][1]
+        operands = memory[group,ptr+1:ptr+1+count]
+
+        if inst in (1,2,7,8):
+            a = get(A,operands[:,0],group,relative_base)
+            b = get(B,operands[:,1],group,relative_base)
+            if inst == 1: # Add
+                data = checked(a + b,a.astype(float) + b)
+            elif inst == 2: # Multiply
+                data = checked(a * b,a.astype(float) * b)
+            elif inst == 7: # less than
+                data = (a < b).astype(np.int64)
+            elif inst == 8: # equals
+                data = (a == b).astype(np.int64)
+            put(C,operands[:,2],group,relative_base,data)
+
+        elif inst == 3: # Get input, per lane
+            data = [inputs[lane][cursor[lane]] for lane in group]
+            for lane in group:
+                cursor[lane] += 1
+            put(A,operands[:,0],group,relative_base,data)
+
+        elif inst == 4: # Save output, per lane
+            for lane,data in zip(group,get(A,operands[:,0],group,relative_base)):
+                outputs[lane].append(int(data))
+
+        elif inst in (5,6): # Jumps, split the lanes by where they go
+            comp = get(A,operands[:,0],group,relative_base)
+            taken = comp != 0 if inst == 5 else comp == 0
+            target = np.where(taken,get(B,operands[:,1],group,relative_base),ptr+3)
+            ret = []
+            for address in np.unique(target):
+                lanes_to = target == address
+                ret.append((int(address),group[lanes_to],relative_base[lanes_to]))
+            return ret
+
+        elif inst == 9: # Append to relative_value
+            relative_base = relative_base + get(A,operands[:,0],group,relative_base)
+
+        return [(ptr + count + 1,group,relative_base)]
+
+    # Groups of lanes by program pointer, with their relative bases
+    groups = {0: (np.arange(lanes),np.zeros(lanes,dtype=np.int64))}
+    while groups:
+        next_groups = dict()
+        for ptr,(group,relative_base) in groups.items():
+            values = memory[group,ptr]
+            for value in np.unique(values):
+                if len(group) == 1 or values.min() == values.max():
+                    subgroup,subbase = group,relative_base
+                else:
+                    agree = values == value
+                    subgroup,subbase = group[agree],relative_base[agree]
+                for ptr_to,group_to,base_to in step(int(value),ptr,subgroup,subbase):
+                    if ptr_to in next_groups:
+                        merged,merged_base = next_groups[ptr_to]
+                        group_to = np.concatenate((merged,group_to))
+                        base_to = np.concatenate((merged_base,base_to))
+                    next_groups[ptr_to] = (group_to,base_to)
+        groups = next_groups
+
+    return outputs,memory
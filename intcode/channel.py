@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import queue
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory
+######################Helping definitions##########################
+# Header slots, the next slot to read and the next slot to write
+HEAD = 0
+TAIL = 1
+HEADER = 2
+
+# Every entry is two int64, a tag and the value
+VALUE = 0
+HALT = 1
+#######################Helping classes#############################
+class RingChannel:
+    """
+    Single producer, single consumer channel of int64 values between two
+    processes, meant as a drop-in for the multiprocessing.Queue wiring
+    Intcode processes together.
+
+    The values live in a ring buffer in shared memory. Only the producer
+    moves the tail and only the consumer moves the head, so reading and
+    writing never takes a lock and never pickles anything. Two semaphores
+    count the filled and free slots, so a side waiting on an empty or full
+    ring sleeps, instead of spinning. The string "HALT", used to stop an
+    IntcodeProcess, is sent as a tagged entry
+    """
+    def __init__(self,capacity=1024):
+        self.capacity = capacity
+        self.memory = shared_memory.SharedMemory(create=True,size=8 * (HEADER + 2 * capacity))
+        self.slots = self.memory.buf.cast('q')
+        self.slots[HEAD] = 0
+        self.slots[TAIL] = 0
+        self.filled = multiprocessing.Semaphore(0)
+        self.free = multiprocessing.Semaphore(capacity)
+        # The creating side frees the shared memory, once the channel
+        # is closed or garbage collected
+        self.finalizer = weakref.finalize(self,self.release,self.memory,self.slots,True)
+
+    def __getstate__(self):
+        # Only the name of the shared memory goes to the other process
+        return (self.capacity,self.memory.name,self.filled,self.free)
+
+    def __setstate__(self,state):
+        self.capacity,name,self.filled,self.free = state
+        self.memory = shared_memory.SharedMemory(name=name)
+        self.slots = self.memory.buf.cast('q')
+        self.finalizer = weakref.finalize(self,self.release,self.memory,self.slots,False)
+
+    def put(self,data,block=True,timeout=None):
+        """
+        Put a value in the channel, waiting for a free slot if full
+        """
+        if data == "HALT":
+            tag,value = HALT,0
+        elif -2**63 <= data < 2**63:
+            tag,value = VALUE,data
+        else:
+            raise OverflowError(f"{data} does not fit in an int64 slot")
+        if not self.free.acquire(block,timeout):
+            raise queue.Full
+        tail = self.slots[TAIL]
+        slot = HEADER + 2 * (tail % self.capacity)
+        self.slots[slot] = tag
+        self.slots[slot + 1] = value
+        self.slots[TAIL] = tail + 1
+        self.filled.release()
+
+    def get(self,block=True,timeout=None):
+        """
+        Get the next value from the channel, waiting for one if empty
+        """
+        if not self.filled.acquire(block,timeout):
+            raise queue.Empty
+        head = self.slots[HEAD]
+        slot = HEADER + 2 * (head % self.capacity)
+        tag,value = self.slots[slot],self.slots[slot + 1]
+        self.slots[HEAD] = head + 1
+        self.free.release()
+        return "HALT" if tag == HALT else value
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def put_nowait(self,data):
+        self.put(data,False)
+
+    def empty(self):
+        return self.slots[HEAD] == self.slots[TAIL]
+
+    def qsize(self):
+        return self.slots[TAIL] - self.slots[HEAD]
+
+    def close(self):
+        """
+        Detach from the shared memory, the creating side also frees it
+        """
+        self.finalizer()
+
+    @staticmethod
+    def release(memory,slots,owner):
+        slots.release()
+        memory.close()
+        if owner:
+            memory.unlink()
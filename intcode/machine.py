@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+import time
+from collections import deque
+from .memory import Memory, PAGE_BITS, PAGE_MASK
+from .opcodes import OPCODES, LATEST
+from .profile import Profile
+from .analysis import analyze
+from .trace import Trace, WRITES
+#######################Helping classes#############################
+class MachineState:
+    """
+    Everything a paused Intcode program consists of: memory, program pointer,
+    relative base, halting status and the pending input and output.
+    A fork continues from the exact same point, independently of the original
+    """
+    def __init__(self,program):
+        self.memory = Memory(program)
+        self.ptr = 0
+        self.relative_base = 0
+        self.halted = False
+        self.input_queue = deque()
+        self.output_queue = deque()
+
+    def fork(self):
+        """
+        Returns an independent copy of the state. The memory is
+        shared copy on write, so this is cheap
+        """
+        state = MachineState.__new__(MachineState)
+        state.memory = self.memory.snapshot()
+        state.ptr = self.ptr
+        state.relative_base = self.relative_base
+        state.halted = self.halted
+        state.input_queue = deque(self.input_queue)
+        state.output_queue = deque(self.output_queue)
+        return state
+
+class IntcodeMachine:
+    """
+    The IntcodeMachine runs an Intcode program inside the current process.
+    The program is a generator, that pauses when it wants input that is
+    not there yet, and after every output.
+
+    The I/O is pluggable, the queues only need to act like a deque
+    (append, popleft and truthiness when not empty). Machines are wired
+    together by handing the output queue of one machine to the next one
+    as input queue, see IntcodeProcess for running one in its own process.
+
+    * version picks the opcode table, see intcode.opcodes
+    * jit compiles straight line code into Python functions, using a static
+      analysis of the program to leave out guards on writes to data
+    * profile collects counters into self.profile, see intcode.profile
+    * trace records every instruction into self.trace, see intcode.trace
+    * The machine can be forked at any pause, to branch off a shared prefix
+    """
+    BLOCKED = "BLOCKED"
+    OUTPUT = "OUTPUT"
+
+    def __init__(self,name,program,version=LATEST,jit=False,profile=False,trace=False):
+        self.name = name
+        self.version = version
+        self.jit = jit
+        self.profile = Profile(version) if profile else None
+        self.hints = analyze(program,version) if jit else None
+        self.trace = Trace(program,version) if trace else None
+        self.initial = MachineState(program)
+        self.state = self.initial.fork()
+        self.runner = self.run()
+
+    @property
+    def input_queue(self):
+        return self.state.input_queue
+
+    @property
+    def output_queue(self):
+        return self.state.output_queue
+
+    def set_input_queue(self,queue):
+        """
+        Sets the input queue, so we can reference it from
+        an outside object
+        """
+        self.state.input_queue = queue
+
+    def set_output_queue(self,queue):
+        """
+        Sets the output queue, so outputs go straight to an outside object
+        """
+        self.state.output_queue = queue
+
+    def fork(self,name):
+        """
+        Returns a new machine continuing from where this one is paused
+        """
+        machine = IntcodeMachine.__new__(IntcodeMachine)
+        machine.name = name
+        machine.version = self.version
+        machine.jit = self.jit
+        machine.profile = Profile(self.version) if self.profile is not None else None
+        machine.hints = self.hints
+        if self.trace is not None:
+            state = self.state
+            machine.trace = Trace(state.memory.to_list(),self.version,state.ptr,state.relative_base)
+        else:
+            machine.trace = None
+        machine.initial = self.initial
+        machine.state = self.state.fork()
+        machine.runner = machine.run()
+        return machine
+
+    def shutdown(self):
+        self.runner.close()
+        self.state.halted = True
+
+    def reset(self):
+        """
+        Stops and resets the machine.
+        Clears the queues and resets the program
+        """
+        self.runner.close()
+        self.output_queue.clear()
+        self.input_queue.clear()
+        state = self.initial.fork()
+        state.input_queue = self.input_queue
+        state.output_queue = self.output_queue
+        self.state = state
+        if self.trace is not None:
+            self.trace = Trace(self.initial.memory.to_list(),self.version)
+        self.runner = self.run()
+
+    def resume(self):
+        """
+        Run the program until it needs input that is not there yet,
+        or until it halts. Returns the number of steps taken
+        """
+        executed = 0
+        for state,count in self.runner:
+            executed += count
+            if state == self.BLOCKED:
+                break
+        return executed
+
+    def wait_for_halt(self):
+        """
+        Run the program until it halts. Only works if all the input
+        it needs is already queued, see run_until_halted for wired machines
+        """
+        self.resume()
+        if not self.is_halted():
+            raise RuntimeError(f"{self.name} is waiting for input")
+
+    def is_halted(self):
+        """
+        Returns if the program is halted or not
+        """
+        return self.state.halted
+
+    def safe_insert_input(self,data):
+        """
+        Insert data into the machine, and run it until the
+        input has been gobbled up
+        """
+        self.input_queue.append(data)
+        self.resume()
+
+    def inspect_program(self):
+        """
+        Inspect the program after it has been halted
+        """
+        return self.state.memory.to_list()
+
+    def run(self):
+        """
+        Run the program as a generator, from wherever the state is paused.
+        Yields (BLOCKED, count) when waiting for input, and (OUTPUT, count)
+        after an output, where count is the number of steps (instructions
+        or compiled blocks) taken since last yield
+        """
+        # Internal helping function
+        def get(mode,argument):
+            """
+            Gets the data based on:
+            * mode 0: position          d[x]
+            * mode 1: intermediate      x
+            * mode 2: relative          d[x + relative_base]
+            """
+            if mode == 0:
+                return program[argument]
+            elif mode == 1:
+                return argument
+            elif mode == 2:
+                return program[argument+relative_base]
+
+        def put(mode,argument,value):
+            """
+            Puts the data based on the mode, addresses past the program
+            are handled by the sparse pages of the memory
+            """
+            if mode == 0:
+                address = argument
+            elif mode == 2:
+                address = argument+relative_base
+            else:
+                raise RuntimeError(f"{self.name} writes in mode {mode} at {ptr}")
+            program[address] = value
+            if trace is not None:
+                trace.step(ptr,inst,address,value)
+            if address in guard:
+                invalidate(address)
+
+        def invalidate(address):
+            """
+            Self modifying write, the cached decoding and any compiled
+            block covering the address are no longer valid
+            """
+            decoded.pop(address,None)
+            for start in guard.pop(address,()):
+                blocks.pop(start,None)
+
+        def check_hints(address):
+            """
+            A cell compiled code writes to without a guard turned out to be
+            code after all. Drop the hints and every compiled block
+            """
+            nonlocal hints
+            if address in unguarded:
+                hints = None
+                unguarded.clear()
+                blocks.clear()
+
+        def decode(ptr):
+            """
+            Decodes the instruction at ptr into the opcode, the parameter
+            modes and the operand count. The result is cached per address,
+            and only thrown away again if a write hits that address, so
+            the address is guarded against writes from compiled code too.
+            Opcodes unknown to the version decode to None
+            """
+            if ptr in decoded:
+                return decoded[ptr]
+            check_hints(ptr)
+            guard.setdefault(ptr,set())
+            value = program[ptr]
+            inst = value % 100
+            if inst not in opcodes:
+                inst = None
+            decoded[ptr] = (inst,
+                            (value // 100) % 10,
+                            (value // 1000) % 10,
+                            (value // 10000) % 10,
+                            opcodes[inst][1] if inst is not None else 0)
+            return decoded[ptr]
+
+        def compile_block(start):
+            """
+            Compiles the straight line code from start into a Python
+            function, up to and including the first jump, or up to the first
+            instruction left to the interpreter (input, output, halt).
+            The function returns (ptr, relative_base, address), where address
+            is set if a write hit guarded code, and the caches have to be
+            invalidated. Writes to a position the hints know as data, and
+            that is not decoded yet, are left unguarded.
+            Returns None if there is nothing to compile
+            """
+            def operand(mode,value):
+                if mode == 0 and value < image_size:
+                    return f"memory.pages[{value >> PAGE_BITS}][{value & PAGE_MASK}]"
+                elif mode == 0:
+                    return f"memory[{value}]"
+                elif mode == 1:
+                    return f"{value}"
+                elif mode == 2:
+                    return f"memory[relative_base+{value}]"
+
+            image_size = len(program)
+            hinted = hints
+            lines = ["def block(memory,relative_base):"]
+            ptr = start
+            while True:
+                inst,A,B,C,count = decode(ptr)
+                if inst in (1,2,7,8) and C != 1:
+                    a,b,ret = program.read(ptr+1,3)
+                    a,b = operand(A,a),operand(B,b)
+                    value = {1: f"{a} + {b}",
+                             2: f"{a} * {b}",
+                             7: f"int({a} < {b})",
+                             8: f"int({a} == {b})"}[inst]
+                    if C == 0 and hinted is not None and ret not in hinted.code and ret not in guard:
+                        unguarded.add(ret)
+                        lines.append(f"    memory[{ret}] = {value}")
+                        ptr += count + 1
+                        continue
+                    target = f"{ret}" if C == 0 else f"relative_base+{ret}"
+                    lines += [f"    address = {target}",
+                              f"    memory[address] = {value}",
+                              f"    if address in guard:",
+                              f"        return ({ptr+4},relative_base,address)"]
+                elif inst == 9:
+                    lines.append(f"    relative_base += {operand(A,program[ptr+1])}")
+                elif inst in (5,6):
+                    comp,ret = program.read(ptr+1,2)
+                    comparison = "!=" if inst == 5 else "=="
+                    lines += [f"    if {operand(A,comp)} {comparison} 0:",
+                              f"        return ({operand(B,ret)},relative_base,None)",
+                              f"    return ({ptr+3},relative_base,None)"]
+                    ptr += count + 1
+                    break
+                else:
+                    lines.append(f"    return ({ptr},relative_base,None)")
+                    break
+                ptr += count + 1
+
+            if ptr == start:
+                return None
+            for address in range(start,ptr):
+                check_hints(address)
+            # The hints were dropped while compiling, start over without them
+            if hinted is not None and hints is None:
+                return compile_block(start)
+            namespace = {"guard": guard}
+            exec("\n".join(lines),namespace)
+            # Guard every cell the block was compiled from
+            for address in range(start,ptr):
+                guard.setdefault(address,set()).add(start)
+            return namespace["block"]
+
+        state = self.state
+        profile = self.profile
+        trace = self.trace
+        jit = self.jit and profile is None and trace is None
+        hints = self.hints
+        unguarded = set()
+        opcodes = OPCODES[self.version]
+        program = state.memory
+        ptr = state.ptr
+        relative_base = state.relative_base
+        decoded = dict()
+        blocks = dict()
+        guard = dict()
+        count = 0
+        while not state.halted:
+            count += 1
+
+            # Run compiled code for as long as we can
+            if jit:
+                if ptr not in blocks:
+                    blocks[ptr] = compile_block(ptr)
+                block = blocks[ptr]
+                if block is not None:
+                    ptr,relative_base,address = block(program,relative_base)
+                    if address is not None:
+                        invalidate(address)
+                    continue
+
+            # Unpack the instruction, the modes are padded with
+            # zeroes for default args
+            inst,A,B,C,_ = decode(ptr)
+            if profile is not None:
+                profile.step(inst,ptr)
+            if trace is not None and inst not in WRITES:
+                trace.step(ptr,inst)
+
+            if inst == 1: # Add
+                a,b,ret = program.read(ptr+1,3)
+                put(C,ret,get(A,a) + get(B,b))
+                ptr += 4
+
+            elif inst == 2: # Multiply
+                a,b,ret = program.read(ptr+1,3)
+                put(C,ret,get(A,a) * get(B,b))
+                ptr += 4
+
+            elif inst == 3: # Get input, pause until there is some
+                while not state.input_queue:
+                    state.ptr = ptr
+                    state.relative_base = relative_base
+                    if profile is not None:
+                        profile.memory(program)
+                    paused = time.perf_counter()
+                    yield (self.BLOCKED,count)
+                    if profile is not None:
+                        profile.io_wait += time.perf_counter() - paused
+                    count = 0
+                put(A,program[ptr+1],state.input_queue.popleft())
+                ptr += 2
+
+            elif inst == 4: # Save output
+                state.output_queue.append(get(A,program[ptr+1]))
+                ptr += 2
+                state.ptr = ptr
+                state.relative_base = relative_base
+                if profile is not None:
+                    profile.memory(program)
+                yield (self.OUTPUT,count)
+                count = 0
+
+            elif inst == 5: # Jump if true
+                comp,ret = program.read(ptr+1,2)
+                if get(A,comp) != 0:
+                    ptr = get(B,ret)
+                else:
+                    ptr += 3
+
+            elif inst == 6: # Jump if false
+                comp,ret = program.read(ptr+1,2)
+                if get(A,comp) == 0:
+                    ptr = get(B,ret)
+                else:
+                    ptr += 3
+
+            elif inst == 7: # less than
+                a,b,ret = program.read(ptr+1,3)
+                put(C,ret,int(get(A,a) < get(B,b)))
+                ptr += 4
+
+            elif inst == 8: # equals
+                a,b,ret = program.read(ptr+1,3)
+                put(C,ret,int(get(A,a) == get(B,b)))
+                ptr += 4
+
+            elif inst == 9: # Append to relative_value
+                relative_base += get(A,program[ptr+1])
+                ptr += 2
+
+            else: # Halt, or undefined inst, terminate
+                break
+
+        # Set halting status, the program can be inspected from now on
+        state.ptr = ptr
+        state.relative_base = relative_base
+        state.halted = True
+        if profile is not None:
+            profile.memory(program)
+#######################Helping functions###########################
+def run_until_halted(machines):
+    """
+    Cooperatively schedule the wired machines in turn, until all of them
+    have halted. If a full round does not move any machine forward, they
+    are all waiting for each other, and we give up
+    """
+    while not all(m.is_halted() for m in machines):
+        if sum(m.resume() for m in machines) == 0:
+            raise RuntimeError("Deadlock, all machines are waiting for input")
+
+def run_program(program,inputs=(),version=LATEST,jit=False,profile=False,trace=False):
+    """
+    Run a program until it halts, with all of its input given up front.
+    Returns the halted machine, to read the output, memory, profile or
+    trace from
+    """
+    machine = IntcodeMachine("Program",program,version,jit,profile,trace)
+    machine.input_queue.extend(inputs)
+    machine.wait_for_halt()
+    return machine
+
+def stream(program,inputs=(),version=LATEST,jit=False):
+    """
+    Run a program as a generator of its outputs, yielded as they come.
+    Nothing runs until the next output is asked for, and the inputs,
+    any iterable, are only pulled when the program wants one. Closing
+    the generator stops the program, and nothing is kept of the outputs
+    already yielded
+    """
+    machine = IntcodeMachine("Stream",program,version,jit)
+    inputs = iter(inputs)
+    try:
+        for event,_ in machine.runner:
+            if event == IntcodeMachine.OUTPUT:
+                yield machine.output_queue.popleft()
+                continue
+            try:
+                machine.input_queue.append(next(inputs))
+            except StopIteration:
+                raise RuntimeError(f"{machine.name} is waiting for input") from None
+    finally:
+        machine.shutdown()
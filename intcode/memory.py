@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+from array import array
+######################Helping definitions##########################
+# Pages are 256 cells, the hot paths below have the shift and mask inlined
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+# Read only page standing in for all the pages never written to
+ZERO_PAGE = (0,) * PAGE_SIZE
+
+# Pages are int64 arrays, 8 bytes a cell, until a value does not fit
+CELL = 'q'
+#######################Helping classes#############################
+class Memory:
+    """
+    Memory for an Intcode program, split into pages.
+    * The program image is loaded into pages up front
+    * Pages past the image are only created when written to, untouched
+      memory reads as 0, so a far away write only costs a single page
+    * A snapshot shares the pages, and whoever writes to a shared page
+      first makes its own copy of it, so snapshots are O(1)
+    * Pages are int64 arrays, so copying one is a memcpy. A page getting
+      a value past int64 is promoted to a list of Python ints, reads do
+      not care which of the two a page is
+    """
+    def __init__(self,program):
+        self.size = len(program)
+        self.pages = dict()
+        for number,start in enumerate(range(0,self.size,PAGE_SIZE)):
+            page = list(program[start:start+PAGE_SIZE])
+            page.extend([0] * (PAGE_SIZE - len(page)))
+            try:
+                self.pages[number] = array(CELL,page)
+            except OverflowError:
+                self.pages[number] = page
+        # The pages, and the page table itself, we are free to write to
+        self.owned = set(self.pages)
+        self.owns_pages = True
+
+    def __len__(self):
+        """
+        Returns the size of the program image
+        """
+        return self.size
+
+    def __getitem__(self,address):
+        if address < 0:
+            raise IndexError(f"Negative address {address}")
+        return self.pages.get(address >> 8,ZERO_PAGE)[address & 255]
+
+    def __setitem__(self,address,value):
+        if address < 0:
+            raise IndexError(f"Negative address {address}")
+        number = address >> 8
+        if number not in self.owned:
+            self.own_page(number)
+        try:
+            self.pages[number][address & 255] = value
+        except OverflowError:
+            self.promote_page(number)
+            self.pages[number][address & 255] = value
+
+    def read(self,address,count):
+        """
+        Reads count cells from address and on
+        """
+        offset = address & PAGE_MASK
+        if address >= 0 and offset + count <= PAGE_SIZE:
+            page = self.pages.get(address >> PAGE_BITS,ZERO_PAGE)
+            return page[offset:offset+count]
+        return [self[i] for i in range(address,address+count)]
+
+    def own_page(self,number):
+        """
+        Makes a private copy of a shared page, or creates a missing one
+        """
+        if not self.owns_pages:
+            self.pages = self.pages.copy()
+            self.owns_pages = True
+        page = self.pages.get(number)
+        self.pages[number] = array(CELL,ZERO_PAGE) if page is None else page[:]
+        self.owned.add(number)
+
+    def promote_page(self,number):
+        """
+        Turns an owned int64 page into a list, to hold values of any size
+        """
+        self.pages[number] = self.pages[number].tolist()
+
+    def snapshot(self):
+        """
+        Returns a copy of the memory, sharing all pages with this one
+        """
+        memory = Memory.__new__(Memory)
+        memory.size = self.size
+        memory.pages = self.pages
+        memory.owned = set()
+        memory.owns_pages = False
+        self.owned = set()
+        self.owns_pages = False
+        return memory
+
+    def to_list(self):
+        """
+        Returns the memory as a plain list. That is the program image,
+        or up to the last page written past it
+        """
+        image_pages = (self.size + PAGE_MASK) >> PAGE_BITS
+        top = max(self.pages,default=-1) + 1
+        ret = [0] * (top * PAGE_SIZE)
+        for number,page in self.pages.items():
+            ret[number*PAGE_SIZE:(number+1)*PAGE_SIZE] = page
+        if top <= image_pages:
+            del ret[self.size:]
+        return ret
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+from collections import deque
+from .machine import IntcodeMachine
+from .opcodes import LATEST
+#######################Helping classes#############################
+class Network:
+    """
+    A graph of Intcode machines, any mix of chains, rings, fan out and
+    fan in. An edge sends every output of one machine to the input of
+    another, outputs of a machine without edges are kept in its own output
+    queue. A single edge shares the queue between the two machines, with
+    more edges the outputs are copied over after the machine ran. The
+    machines are scheduled cooperatively in this process, only machines
+    with input waiting are resumed, until the whole network is quiescent:
+    every machine has halted, or waits for input nobody sends.
+    Connect the machines before running them
+    """
+    def __init__(self):
+        self.nodes = dict()
+        self.edges = dict()
+
+    def add(self,name,program,version=LATEST,jit=False):
+        """
+        Adds a machine by name, running the program given, or an
+        IntcodeMachine, like a fork of a primed one. Returns the machine
+        """
+        if isinstance(program,IntcodeMachine):
+            machine = program
+        else:
+            machine = IntcodeMachine(name,program,version,jit)
+        self.nodes[name] = machine
+        self.edges[name] = []
+        return machine
+
+    def connect(self,source,target):
+        """
+        Send the outputs of source to the input of target
+        """
+        self.edges[source].append(target)
+        if len(self.edges[source]) == 1:
+            self.nodes[source].set_output_queue(self.nodes[target].input_queue)
+        elif len(self.edges[source]) == 2:
+            # Not shared with the first target any more, see fan_out
+            self.nodes[source].set_output_queue(deque())
+
+    def fan_out(self,name):
+        """
+        Copy the outputs of a machine with more than one edge to the
+        inputs of all of the targets
+        """
+        output_queue = self.nodes[name].output_queue
+        while output_queue:
+            value = output_queue.popleft()
+            for target in self.edges[name]:
+                self.nodes[target].input_queue.append(value)
+
+    def send(self,name,*values):
+        """
+        Queue input values for a machine
+        """
+        self.nodes[name].input_queue.extend(values)
+
+    def run(self):
+        """
+        Run the network until it is quiescent. Every machine starts out
+        ready, afterwards a machine is only ready again when one of its
+        sources gave it input. Returns the names of the machines left
+        waiting for input, none if they all halted
+        """
+        ready = deque(self.nodes)
+        queued = set(ready)
+        while ready:
+            name = ready.popleft()
+            queued.discard(name)
+            self.nodes[name].resume()
+            if len(self.edges[name]) > 1:
+                self.fan_out(name)
+            for target in self.edges[name]:
+                machine = self.nodes[target]
+                if target not in queued and machine.input_queue and not machine.is_halted():
+                    ready.append(target)
+                    queued.add(target)
+        return [name for name,machine in self.nodes.items() if not machine.is_halted()]
+
+    def wait_for_halt(self):
+        """
+        Run the network until every machine halted, a machine still
+        waiting for input then means the network is deadlocked
+        """
+        waiting = self.run()
+        if waiting:
+            raise RuntimeError(f"Deadlock, waiting for input: {', '.join(waiting)}")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+######################Helping definitions##########################
+# The instruction set grew over the days. Each version maps the opcodes it
+# knows to their name and the number of operands following them. Opcodes
+# missing from the version a machine runs are undefined, and terminate it
+ADD = 1
+MULTIPLY = 2
+INPUT = 3
+OUTPUT = 4
+JUMP_IF_TRUE = 5
+JUMP_IF_FALSE = 6
+LESS_THAN = 7
+EQUALS = 8
+RELATIVE_BASE = 9
+HALT = 99
+
+OPCODES = dict()
+
+# Day 2, arithmetic only
+OPCODES[2] = {
+    ADD: ("add", 3),
+    MULTIPLY: ("multiply", 3),
+    HALT: ("halt", 0)
+}
+
+# Day 5, input/output, jumps and comparisons, and the intermediate mode
+OPCODES[5] = {
+    **OPCODES[2],
+    INPUT: ("input", 1),
+    OUTPUT: ("output", 1),
+    JUMP_IF_TRUE: ("jump_if_true", 2),
+    JUMP_IF_FALSE: ("jump_if_false", 2),
+    LESS_THAN: ("less_than", 3),
+    EQUALS: ("equals", 3)
+}
+
+# Day 9, the relative base and the relative mode
+OPCODES[9] = {
+    **OPCODES[5],
+    RELATIVE_BASE: ("relative_base", 1)
+}
+
+LATEST = max(OPCODES)
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+#######################Helping functions###########################
+def data_parser(filepath):
+    """
+    Parse the data by splitting the line by commas, and making input
+    to ints
+    """
+    with open(filepath, 'r') as f:
+        return [int(x) for x in f.readline().split(",")]
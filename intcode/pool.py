@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import os
+import hashlib
+import itertools
+import threading
+from queue import Empty
+from concurrent.futures import Future
+from multiprocessing import Process, Queue
+from .machine import IntcodeMachine
+from .opcodes import LATEST
+#######################Helping functions###########################
+def program_id(program):
+    """
+    Returns the content hash a program is referenced by
+    """
+    return hashlib.sha1(",".join(map(str,program)).encode()).hexdigest()
+
+def worker(jobs,results,version,jit):
+    """
+    Worker process main loop. Programs arrive once, with the first job for
+    them, and stay loaded as halted-at-start machines. Every job forks
+    one of these, feeds it the inputs and runs it to its halt
+    """
+    loaded = dict()
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id,pid,program,inputs = job
+        try:
+            if program is not None:
+                loaded[pid] = IntcodeMachine(pid,program,version,jit)
+            machine = loaded[pid].fork(f"{pid} job {job_id}")
+            machine.input_queue.extend(inputs)
+            machine.wait_for_halt()
+            results.put((job_id,None,list(machine.output_queue)))
+        except Exception as e:
+            results.put((job_id,f"{type(e).__name__}: {e}",None))
+#######################Helping classes#############################
+class IntcodePool:
+    """
+    Long lived pool of worker processes for running many small Intcode jobs.
+    Programs are loaded once with load(), and jobs reference them by content
+    hash. A program image is only sent to a worker the first time that
+    worker gets a job for it, and jobs prefer workers already holding it.
+    submit() returns a concurrent.futures.Future of the job's outputs.
+    Should a worker die, its pending jobs fail and it gets no new ones
+    """
+    def __init__(self,workers=None,version=LATEST,jit=False):
+        self.programs = dict()
+        self.results = Queue()
+        self.jobs = []
+        self.loaded = []
+        self.pending = []
+        self.processes = []
+        for _ in range(workers or os.cpu_count() or 1):
+            jobs = Queue()
+            process = Process(target=worker,args=(jobs,self.results,version,jit),daemon=True)
+            process.start()
+            self.jobs.append(jobs)
+            self.loaded.append(set())
+            self.pending.append(0)
+            self.processes.append(process)
+
+        self.futures = dict()
+        self.job_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.collector = threading.Thread(target=self.collect,daemon=True)
+        self.collector.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.shutdown()
+
+    def load(self,program):
+        """
+        Registers a program, and returns the id to submit jobs with
+        """
+        pid = program_id(program)
+        self.programs[pid] = list(program)
+        return pid
+
+    def submit(self,pid,inputs=()):
+        """
+        Queue a job running program pid on the inputs
+        """
+        if pid not in self.programs:
+            raise KeyError(f"Program {pid} is not loaded")
+        future = Future()
+        with self.lock:
+            job_id = next(self.job_ids)
+            alive = [i for i,process in enumerate(self.processes) if process.is_alive()]
+            if not alive:
+                raise RuntimeError("Every worker of the pool died")
+            # The least busy worker, and one holding the program on a tie
+            index = min(alive,key=lambda i: (self.pending[i],pid not in self.loaded[i]))
+            program = None
+            if pid not in self.loaded[index]:
+                program = self.programs[pid]
+                self.loaded[index].add(pid)
+            self.pending[index] += 1
+            self.futures[job_id] = (future,index)
+        self.jobs[index].put((job_id,pid,program,list(inputs)))
+        return future
+
+    def map(self,pid,inputs_list):
+        """
+        Run the program on every input list, and return the outputs in order
+        """
+        futures = [self.submit(pid,inputs) for inputs in inputs_list]
+        return [future.result() for future in futures]
+
+    def collect(self):
+        """
+        Collector thread, resolving the futures as results come in
+        """
+        while True:
+            try:
+                result = self.results.get(timeout=1)
+            except Empty:
+                # Nothing came in for a while, so no result is on its way
+                # from a dead worker any more
+                self.fail_dead()
+                continue
+            if result is None:
+                break
+            job_id,error,outputs = result
+            with self.lock:
+                if job_id not in self.futures:
+                    continue
+                future,index = self.futures.pop(job_id)
+                self.pending[index] -= 1
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(outputs)
+
+    def fail_dead(self):
+        """
+        Fail the pending jobs of the workers that died
+        """
+        with self.lock:
+            dead = {i for i,process in enumerate(self.processes) if not process.is_alive()}
+            failed = [(job_id,future,index) for job_id,(future,index) in self.futures.items()
+                      if index in dead]
+            for job_id,_,index in failed:
+                del self.futures[job_id]
+                self.pending[index] -= 1
+        for _,future,index in failed:
+            exitcode = self.processes[index].exitcode
+            future.set_exception(RuntimeError(f"Worker {index} died with exit code {exitcode}"))
+
+    def shutdown(self):
+        """
+        Stop the workers once their queued jobs are done, and the collector
+        """
+        for jobs in self.jobs:
+            jobs.put(None)
+        for process in self.processes:
+            process.join()
+        self.results.put(None)
+        self.collector.join()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import queue
+import traceback
+from multiprocessing import Process, Queue, Event, Lock
+from .machine import IntcodeMachine
+from .channel import RingChannel
+from .opcodes import LATEST
+#######################Helping classes#############################
+class IntcodeProcess(Process):
+    """
+    The IntcodeProcess Is A multiprocess class
+    That have the ability to wait for input from a
+    queue(Get input), and dump to a queue (Set input),
+    And inspect the Intcode program when the process has halted.
+    The program itself runs on an IntcodeMachine inside the process.
+    The input and output queues are made by channel, shared memory ring
+    buffers by default, or multiprocessing.Queue for values past int64.
+    If the program fails inside the process, like on a value past int64
+    in a ring, it halts, and wait_for_halt raises the error in the parent
+    """
+    def __init__(self,name,program,version=LATEST,jit=False,channel=RingChannel):
+        super().__init__()
+        self.name = name
+        self.output_queue = channel()
+        self.input_queue = channel()
+        self.program = program
+        self.version = version
+        self.jit = jit
+        self.program_queue = Queue()
+        # Set while the program is halted, waiting on it blocks, not spins
+        self.halted = Event()
+        # Set along with halted if the program failed, the traceback
+        # is waiting in error_queue
+        self.failed = Event()
+        self.error_queue = Queue()
+
+        self.reset_lock = Lock()
+        self.got_input_lock = Lock()
+        self.input_submitted = Lock()
+
+    def set_input_queue(self,queue):
+        """
+        Sets the input queue, so we can reference it from
+        an outside object
+        """
+        self.input_queue = queue
+
+    def shutdown(self):
+        """
+        Stops the program if needed, and lets the process terminate
+        """
+        if not self.is_halted():
+            self.input_queue.put("HALT")
+            self.wait_for_halt()
+        self.reset_lock.release()
+        self.join()
+
+    def reset(self):
+        """
+        Stops and resets the processor if possible.
+        Clears the internal queues and resets the program
+        """
+        # IF not halted, send HALT to input and wait
+        # for a halt command
+        if not self.is_halted():
+            self.input_queue.put("HALT")
+            self.wait_for_halt()
+
+        # Clear the queues
+        self.drain(self.output_queue)
+        self.drain(self.input_queue)
+        self.drain(self.program_queue)
+
+        # Clear the halted status, and release the lock to run
+        self.halted.clear()
+        self.reset_lock.release()
+
+    @staticmethod
+    def drain(channel):
+        """
+        Throw away everything in the queue, without polling it for emptiness
+        """
+        try:
+            while True:
+                channel.get_nowait()
+        except queue.Empty:
+            pass
+
+    def wait_for_halt(self,timeout=None):
+        """
+        Will only pass if current program has halted, and needs reset.
+        Returns if the program halted within the timeout, and raises
+        RuntimeError if it failed
+        """
+        halted = self.halted.wait(timeout)
+        if halted and self.failed.is_set():
+            self.failed.clear()
+            raise RuntimeError(f"{self.name} failed:\n{self.error_queue.get()}")
+        return halted
+
+    def is_halted(self):
+        """
+        Returns if the program is halted or not
+        """
+        return self.halted.is_set()
+
+    def safe_insert_input(self,data):
+        """
+        Insert data safe into the process, and
+        detect if it has been gobbled up
+        """
+        self.got_input_lock.acquire()
+        self.input_queue.put(data)
+        self.input_submitted.acquire()
+        self.got_input_lock.release()
+        self.input_submitted.release()
+
+    def inspect_program(self):
+        """
+        Inspect the program after it has been halted
+        """
+        return self.program_queue.get()
+
+    def run(self):
+        """
+        Run the program
+        """
+        # Acquire the lock initially, since it is "inverse"
+        self.got_input_lock.acquire()
+
+        # Running loop
+        while True:
+            # Acquire the lock, so we know that we need to run
+            self.reset_lock.acquire()
+
+            # If the program already halted, we become ready to terminate
+            # No more running from this point!
+            if(self.is_halted()):
+                break
+
+            machine = IntcodeMachine(self.name,self.program,self.version,self.jit)
+            try:
+                self.execute(machine)
+            except Exception:
+                # Halt anyway, so nobody waits forever, and hand the
+                # error to whoever waits for the halt
+                self.error_queue.put(traceback.format_exc())
+                self.failed.set()
+
+            # Save the program after it halted, and set halting status
+            self.program_queue.put(machine.inspect_program())
+            self.halted.set()
+
+    def execute(self,machine):
+        """
+        Run the machine until it halts, or HALT is received as input
+        """
+        for event,_ in machine.runner:
+            if event == IntcodeMachine.OUTPUT:
+                self.output_queue.put(machine.output_queue.popleft())
+                continue
+
+            # Get input. Special case, halt if string received("HALT")
+            self.got_input_lock.release()
+            self.input_submitted.acquire()
+
+            data = self.input_queue.get()
+
+            self.input_submitted.release()
+            self.got_input_lock.acquire()
+
+            # Halt program if Halt command is seen
+            if data == "HALT":
+                break
+            machine.input_queue.append(data)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+from collections import Counter
+from .memory import PAGE_SIZE
+from .opcodes import OPCODES, LATEST
+#######################Helping classes#############################
+class Profile:
+    """
+    Counters collected by an IntcodeMachine running with profile=True.
+    * opcodes:    instructions executed per opcode
+    * addresses:  instructions executed per address
+    * high_water: memory cells allocated at most, the memory never shrinks
+    * io_wait:    seconds spent paused, waiting for input
+    Profiling runs on the interpreter, also for machines with jit on, so
+    every instruction is counted by itself
+    """
+    def __init__(self,version=LATEST):
+        self.version = version
+        # Instructions executed per (opcode, address)
+        self.stacks = Counter()
+        self.high_water = 0
+        self.io_wait = 0.0
+
+    def step(self,inst,ptr):
+        """
+        Count a single instruction
+        """
+        self.stacks[(inst,ptr)] += 1
+
+    @property
+    def opcodes(self):
+        ret = Counter()
+        for (inst,_),count in self.stacks.items():
+            ret[inst] += count
+        return ret
+
+    @property
+    def addresses(self):
+        ret = Counter()
+        for (_,ptr),count in self.stacks.items():
+            ret[ptr] += count
+        return ret
+
+    def memory(self,memory):
+        """
+        Update the high water mark from the memory
+        """
+        self.high_water = max(self.high_water,len(memory.pages) * PAGE_SIZE)
+
+    def name(self,inst):
+        """
+        Returns the name of an opcode
+        """
+        if inst in OPCODES[self.version]:
+            return OPCODES[self.version][inst][0]
+        return "undefined"
+
+    def to_dict(self):
+        return {
+            "instructions": sum(self.stacks.values()),
+            "opcodes": {self.name(k): v for k,v in self.opcodes.most_common()},
+            "addresses": {str(k): v for k,v in self.addresses.most_common()},
+            "high_water": self.high_water,
+            "io_wait": self.io_wait
+        }
+
+    def to_json(self):
+        """
+        Dumps the counters as JSON
+        """
+        # Only needed when profiling, and slow to import, so only import it here
+        import json
+        return json.dumps(self.to_dict(),indent=2)
+
+    def to_folded(self,name):
+        """
+        Dumps the counters as folded stacks, one "name;opcode;address count"
+        line each, for flamegraph.pl and friends
+        """
+        return "\n".join(f"{name};{self.name(inst)};{ptr} {count}"
+                         for (inst,ptr),count in sorted(self.stacks.items(),key=lambda x: x[0][1]))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+import bisect
+from .memory import Memory
+from .opcodes import LATEST, RELATIVE_BASE
+######################Helping definitions##########################
+MAGIC = b"ICT1"
+
+# Instructions writing a cell, their step carries the address and value
+WRITES = (1,2,3,7,8)
+#######################Helping functions###########################
+def put_varint(data,value):
+    """
+    Appends a signed int, zigzag and LEB128 encoded, so small values
+    of either sign take a single byte
+    """
+    value = (value << 1) if value >= 0 else ((-value) << 1) - 1
+    while value >= 0x80:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+
+def get_varint(data,offset):
+    """
+    Reads a signed int written by put_varint, returns it and the offset
+    following it
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            break
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1),offset
+#######################Helping classes#############################
+class Trace:
+    """
+    Binary trace of an IntcodeMachine running with trace=True, one record
+    per instruction executed:
+    * the program pointer, as the difference to the one before
+    * the opcode, a single byte, 0 for undefined opcodes
+    * for instructions writing a cell, the address as the difference to
+      the address written before, and the value written
+    Along with the memory, program pointer and relative base it started
+    from, that is enough to replay the run without executing it, see Replay.
+    Tracing runs on the interpreter, also for machines with jit on
+    """
+    def __init__(self,program,version=LATEST,ptr=0,relative_base=0):
+        self.program = list(program)
+        self.version = version
+        self.ptr = ptr
+        self.relative_base = relative_base
+        self.data = bytearray()
+        self.steps = 0
+        self.last_ptr = ptr
+        self.last_address = 0
+
+    def __len__(self):
+        return self.steps
+
+    def step(self,ptr,inst,address=None,value=None):
+        """
+        Record a single instruction, and the cell it wrote if any
+        """
+        put_varint(self.data,ptr - self.last_ptr)
+        self.data.append(inst or 0)
+        if inst in WRITES:
+            put_varint(self.data,address - self.last_address)
+            put_varint(self.data,value)
+            self.last_address = address
+        self.last_ptr = ptr
+        self.steps += 1
+
+    def to_bytes(self):
+        header = bytearray(MAGIC)
+        for value in (self.version,self.ptr,self.relative_base,self.steps,len(self.program)):
+            put_varint(header,value)
+        for value in self.program:
+            put_varint(header,value)
+        return bytes(header + self.data)
+
+    @classmethod
+    def from_bytes(cls,data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not an Intcode trace")
+        offset = len(MAGIC)
+        fields = []
+        for _ in range(5):
+            value,offset = get_varint(data,offset)
+            fields.append(value)
+        version,ptr,relative_base,steps,size = fields
+        program = []
+        for _ in range(size):
+            value,offset = get_varint(data,offset)
+            program.append(value)
+        trace = cls(program,version,ptr,relative_base)
+        trace.data = bytearray(data[offset:])
+        trace.steps = steps
+        return trace
+
+    def save(self,filepath):
+        with open(filepath,"wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls,filepath):
+        with open(filepath,"rb") as f:
+            return cls.from_bytes(f.read())
+
+class Replay:
+    """
+    Replays a Trace, by applying the recorded writes to a memory, instead
+    of executing anything. After seek(n) the memory and relative base are
+    as they were after the first n instructions, and ptr and inst are those
+    of the n-th instruction. A checkpoint is kept every interval steps
+    replayed, copy on write snapshots of the memory, so seeking to any step
+    only replays from the closest checkpoint before it
+    """
+    def __init__(self,trace,interval=1024):
+        self.trace = trace
+        self.interval = interval
+        self.memory = Memory(trace.program)
+        self.step = 0
+        self.ptr = trace.ptr
+        self.inst = None
+        self.relative_base = trace.relative_base
+        self.offset = 0
+        self.last_address = 0
+        self.checkpoints = [self.checkpoint()]
+
+    def __len__(self):
+        return len(self.trace)
+
+    def checkpoint(self):
+        return (self.step,self.memory.snapshot(),self.ptr,self.inst,
+                self.relative_base,self.offset,self.last_address)
+
+    def restore(self,checkpoint):
+        (self.step,memory,self.ptr,self.inst,
+         self.relative_base,self.offset,self.last_address) = checkpoint
+        self.memory = memory.snapshot()
+
+    def forward(self):
+        """
+        Replay the next instruction. Returns the address written and the
+        value written, or None
+        """
+        data = self.trace.data
+        delta,self.offset = get_varint(data,self.offset)
+        self.ptr += delta
+        self.inst = data[self.offset]
+        self.offset += 1
+        self.step += 1
+        ret = None
+        if self.inst in WRITES:
+            delta,self.offset = get_varint(data,self.offset)
+            value,self.offset = get_varint(data,self.offset)
+            self.last_address += delta
+            self.memory[self.last_address] = value
+            ret = (self.last_address,value)
+        elif self.inst == RELATIVE_BASE:
+            # Read the operand like the machine did, nothing written yet
+            mode = (self.memory[self.ptr] // 100) % 10
+            operand = self.memory[self.ptr+1]
+            if mode == 0:
+                operand = self.memory[operand]
+            elif mode == 2:
+                operand = self.memory[operand+self.relative_base]
+            self.relative_base += operand
+        if self.step % self.interval == 0 and self.step > self.checkpoints[-1][0]:
+            self.checkpoints.append(self.checkpoint())
+        return ret
+
+    def seek(self,step):
+        """
+        Moves to right after the step given, forwards or backwards
+        """
+        if not 0 <= step <= len(self.trace):
+            raise IndexError(f"Step {step} is outside the trace of {len(self.trace)} steps")
+        if step < self.step or step - self.step > self.interval:
+            index = bisect.bisect_right([c[0] for c in self.checkpoints],step) - 1
+            if self.checkpoints[index][0] > self.step or step < self.step:
+                self.restore(self.checkpoints[index])
+        while self.step < step:
+            self.forward()
+        return self
+
+    def __iter__(self):
+        """
+        Replay the remaining instructions, yields (step, ptr, opcode, write)
+        where write is the (address, value) written, or None
+        """
+        while self.step < len(self.trace):
+            write = self.forward()
+            yield (self.step,self.ptr,self.inst,write)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import os
+import sys
+import traceback
+# The shared Intcode engine lives in the root of the repository, next to this
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0,ROOT)
+from test import RED, GREEN, YELLOW, NC, load_day
+from intcode import data_parser, run_program, IntcodeProcess, Network, IntcodePool, Trace, Replay
+from intcode.memory import PAGE_BITS
+#######################Helping functions###########################
+def program(day):
+    """
+    Returns the Intcode program of a day, as a list
+    """
+    return list(data_parser(os.path.join(ROOT,"Days",str(day),"input1.txt")))
+
+def process_chain():
+    """
+    Day 7 amplifiers as IntcodeProcesses in a feedback ring, with their
+    ring channels, run twice with a reset in between, against a Network
+    of the same machines in this process
+    """
+    d = program(7)
+    phases = (9,8,7,6,5)
+    network = Network()
+    for i,phase in enumerate(phases):
+        network.add(i,d,version=5).safe_insert_input(phase)
+    for i in range(len(phases)):
+        network.connect(i,(i + 1) % len(phases))
+    network.send(0,0)
+    network.wait_for_halt()
+    wanted = network.nodes[0].input_queue.popleft()
+
+    processes = [IntcodeProcess(f"Amplifier {i}",d,version=5) for i in range(len(phases))]
+    for i,process in enumerate(processes):
+        process.set_input_queue(processes[i - 1].output_queue)
+    for process in processes:
+        process.start()
+    try:
+        for _ in range(2):
+            for process,phase in zip(processes,phases):
+                process.safe_insert_input(phase)
+            processes[0].safe_insert_input(0)
+            for process in processes:
+                assert process.wait_for_halt(60), f"{process.name} did not halt"
+            got = processes[-1].output_queue.get(timeout=10)
+            assert got == wanted, f"got {got}, wanted {wanted}"
+            for process in processes:
+                process.reset()
+    finally:
+        for process in processes:
+            process.shutdown()
+
+def pool_map():
+    """
+    Both stars of Day 9 as jobs on a pool of two workers, against the
+    engine in this process
+    """
+    d = program(9)
+    wanted = [list(run_program(d,[star]).output_queue) for star in (1,2)]
+    with IntcodePool(2) as pool:
+        pid = pool.load(d)
+        got = pool.map(pid,[[1],[2]])
+    assert got == wanted, f"got {got}, wanted {wanted}"
+
+def trace_replay():
+    """
+    Trace Day 9 star 1, send the trace through its binary form, and replay
+    it to the end, which has to give the memory the machine halted with
+    """
+    machine = run_program(program(9),[1],trace=True)
+    replay = Replay(Trace.from_bytes(machine.trace.to_bytes())).seek(len(machine.trace))
+    assert replay.memory.to_list() == machine.inspect_program(), "memory differs"
+    assert replay.ptr == machine.state.ptr, f"ptr {replay.ptr}, wanted {machine.state.ptr}"
+    assert replay.relative_base == machine.state.relative_base, "relative base differs"
+
+def batch_lanes():
+    """
+    Day 5 with both star inputs as lanes of one batch, against the engine
+    in this process, lane by lane. Skipped without NumPy
+    """
+    try:
+        from intcode.batch import run_batch
+    except ImportError:
+        return "needs NumPy"
+    d = program(5)
+    inputs = [[1],[5]]
+    outputs,memory = run_batch(d,inputs,version=5)
+    for lane,lane_inputs in enumerate(inputs):
+        machine = run_program(d,lane_inputs,version=5)
+        wanted = list(machine.output_queue)
+        assert outputs[lane] == wanted, f"lane {lane} got {outputs[lane]}, wanted {wanted}"
+        assert memory[lane].tolist() == machine.inspect_program(), f"lane {lane} memory differs"
+
+def against_interpreter(program,inputs=()):
+    """
+    Run the program with the jit and without, and check they end in the
+    same outputs and memory. Returns the outputs
+    """
+    interpreted = run_program(program,inputs)
+    compiled = run_program(program,inputs,jit=True)
+    wanted,got = list(interpreted.output_queue),list(compiled.output_queue)
+    assert got == wanted, f"{program}: jit got {got}, wanted {wanted}"
+    assert compiled.inspect_program() == interpreted.inspect_program(), f"{program}: memory differs"
+    return got
+
+def jit_guards():
+    """
+    Self modifying programs on the jit against the interpreter: the quine,
+    a write into the next instruction of the same block, and a write the
+    hints took for data, to a cell only reached through an indirect jump
+    """
+    quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    assert against_interpreter(quine) == quine, "quine does not output itself"
+    # 1101 turns the 1101 at 4 into 104,7 and a halt at 6
+    next_instruction = [1101,0,104,4, 1101,7,99,8, 99]
+    assert against_interpreter(next_instruction) == [7], "write into the block was missed"
+    # Three rounds of: 1001 bumps the value the 1101 at 9 stores, 105 jumps
+    # there through the address held at 8, and 4 outputs what it stored
+    hinted_data = [1001,11,1,11, 105,1,8, 99, 9, 1101,0,0,23, 4,23,
+                   1001,24,-1,24, 1005,24,0, 99, 0,3]
+    assert against_interpreter(hinted_data) == [1,2,3], "write to code hinted as data was missed"
+
+def page_promotion():
+    """
+    Values past int64, stored in the program image and in a sparse page
+    past it, have to turn their int64 page into a list, with the jit and
+    without
+    """
+    big = [1102,34915192,34915192,7,4,7,99,0]
+    assert against_interpreter(big) == [34915192 * 34915192], "16 digit product is wrong"
+    for address in (7,1000):
+        program = [1102,2**40,2**40,address,4,address,99,0]
+        assert against_interpreter(program) == [2**80], f"2**80 stored at {address} is wrong"
+        for jit in (False,True):
+            pages = run_program(program,jit=jit).state.memory.pages
+            assert isinstance(pages[address >> PAGE_BITS],list), f"page of {address} not promoted"
+
+def thruster_workers():
+    """
+    Day 7 star 2 with the permutations dealt out over two worker
+    processes, against the serial run
+    """
+    day = load_day(7,os.path.join(ROOT,"Days","7","Python"))
+    d = program(7)
+    wanted = day.solver_2star(list(d))
+    got = day.solver_2star(list(d),workers=2)
+    assert got == wanted, f"got {got} with workers, wanted {wanted}"
+######################Helping definitions##########################
+CHECKS = (process_chain,pool_map,trace_replay,batch_lanes,jit_guards,page_promotion,
+          thruster_workers)
+##############################MAIN#################################
+def main():
+    """
+    Run the smoke checks of the Intcode engine paths no day uses by
+    default, like processes, pools, traces and batches, or no input runs
+    into, like self modifying code on the jit and values past int64.
+    A check returns
+    the reason it was skipped, if it was
+    """
+    ok = True
+    for check in CHECKS:
+        try:
+            skipped = check()
+            if skipped:
+                print(f"Smoke {check.__name__:<18}{YELLOW}Skipped,{NC} {skipped}")
+            else:
+                print(f"Smoke {check.__name__:<18}{GREEN}Correct!{NC}")
+        except Exception:
+            ok = False
+            print(f"Smoke {check.__name__:<18}{RED}Failed!{NC}")
+            print(traceback.format_exc().rstrip())
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
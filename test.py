@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+import os
+import sys
+import copy
+import glob
+import json
+import time
+import inspect
+import argparse
+import resource
+import traceback
+import importlib.util
+import multiprocessing
+from multiprocessing.connection import wait
+######################Helping definitions##########################
+RED = '\033[0;31m'
+GREEN = '\033[0;32m'
+YELLOW = '\033[0;33m'
+NC = '\033[0m' # No Color
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+#######################Helping functions###########################
+def load_day(day,folder):
+    """
+    Import the run.py of a day as a module of its own, without running main
+    """
+    spec = importlib.util.spec_from_file_location(f"day{day}",os.path.join(folder,"run.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def cpu_time():
+    """
+    CPU time of this process and of its finished children, like the pools
+    some of the solvers use
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def reset_peak_rss():
+    """
+    Reset the peak RSS of this process to its current RSS, where Linux
+    allows it. Returns if it did
+    """
+    try:
+        with open("/proc/self/clear_refs","w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss():
+    """
+    Peak RSS of this process in kB since the last reset, or since it
+    started where there is no /proc
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def measure(function,*args):
+    """
+    Call the function, returns the result, and the wall time, CPU time
+    and peak RSS in kB of the call. Without a way to reset the peak RSS,
+    it is the high water mark of this process so far, marked by
+    peak_rss_reset being False
+    """
+    reset = reset_peak_rss()
+    wall,cpu = time.perf_counter(),cpu_time()
+    result = function(*args)
+    wall,cpu = time.perf_counter() - wall,cpu_time() - cpu
+    return result,{"wall": wall,
+                   "cpu": cpu,
+                   "peak_rss_kb": peak_rss(),
+                   "peak_rss_reset": reset}
+
+def run_day(day,folder,stars=(1,2)):
+    """
+    Import a day once, parse its input once, and run the stars on their
+    own copy of it. Returns a dict of the results and timings
+    """
+    ret = {"day": day, "language": "Python", "stars": []}
+    # Run from the folder of the day, like test.sh did
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        module,ret["import"] = measure(load_day,day,folder)
+        d,ret["parse"] = measure(module.data_parser,os.path.join(folder,"..","input1.txt"))
+        # Make list, since the generator has to be used by both stars
+        if inspect.isgenerator(d):
+            d = list(d)
+        for star in stars:
+            solver = getattr(module,f"solver_{star}star")
+            with open(os.path.join(folder,"..",f"star{star}.txt")) as f:
+                wanted = f.read().strip()
+            # Copy it since the solvers do inline manipulation
+            got,timing = measure(solver,copy.deepcopy(d))
+            ret["stars"].append({"star": star,
+                                 "wanted": wanted,
+                                 "got": str(got),
+                                 "correct": str(got) == wanted,
+                                 **timing})
+    finally:
+        os.chdir(cwd)
+    return ret
+
+def task(day,folder,star,connection):
+    """
+    Worker process running a single star, sends back the result of
+    run_day, or the traceback if it failed
+    """
+    try:
+        connection.send(run_day(day,folder,(star,)))
+    except Exception:
+        connection.send({"error": traceback.format_exc()})
+    connection.close()
+
+def failed(day,star,error):
+    """
+    Returns the result of a day with a single star that did not finish
+    """
+    return {"day": day, "language": "Python", "import": None, "parse": None,
+            "stars": [{"star": star, "wanted": None, "got": None,
+                       "correct": False, "error": error}]}
+
+def run_parallel(tasks,jobs,timeout):
+    """
+    Run (day, folder, star) tasks over up to jobs worker processes at a
+    time, each in a process of its own, so one past the timeout can be
+    killed. Yields the results in the order of the tasks, as soon as all
+    tasks before them are done
+    """
+    pending = list(enumerate(tasks))
+    running = dict()
+    results = dict()
+    reported = 0
+    while pending or running:
+        while pending and len(running) < jobs:
+            index,(day,folder,star) = pending.pop(0)
+            receiver,sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=task,args=(day,folder,star,sender))
+            process.start()
+            sender.close()
+            running[receiver] = (index,process,time.perf_counter())
+
+        # Wait for a result, or for the first task to time out
+        deadline = None
+        if timeout is not None:
+            first = min(started for _,_,started in running.values())
+            deadline = max(0,first + timeout - time.perf_counter())
+        for receiver in wait(list(running),deadline):
+            index,process,_ = running.pop(receiver)
+            day,_,star = tasks[index]
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = {"error": f"Worker died with exit code {process.exitcode}"}
+            process.join()
+            if "error" in result:
+                result = failed(day,star,result["error"])
+            results[index] = result
+
+        for receiver,(index,process,started) in list(running.items()):
+            if timeout is not None and time.perf_counter() - started >= timeout:
+                process.kill()
+                process.join()
+                del running[receiver]
+                day,_,star = tasks[index]
+                results[index] = failed(day,star,f"Timed out after {timeout}s")
+
+        while reported in results:
+            yield results.pop(reported)
+            reported += 1
+
+def merge(results):
+    """
+    Merge the results of single stars into one per day, keeping the import
+    and parse timings of the first star that got that far
+    """
+    ret = []
+    for result in results:
+        if ret and ret[-1]["day"] == result["day"]:
+            for key in ("import","parse"):
+                ret[-1][key] = ret[-1][key] or result[key]
+            ret[-1]["stars"] += result["stars"]
+        else:
+            ret.append(result)
+    return ret
+
+def find_days(days):
+    """
+    Returns (day, folder, language) for every solution of the days, and
+    (day, None, None) for days without any
+    """
+    ret = []
+    for day in days:
+        folders = sorted(glob.glob(os.path.join(ROOT,"Days",str(day),"*","")))
+        if not folders:
+            ret.append((day,None,None))
+        for folder in folders:
+            ret.append((day,folder,os.path.basename(os.path.dirname(folder))))
+    return ret
+
+def report(result):
+    """
+    Print the result of a day, the way test.sh did, with the timings
+    """
+    day = result["day"]
+    timing = ""
+    if result["import"] is not None and result["parse"] is not None:
+        timing = f"   import {result['import']['wall']:.3f}s, parse {result['parse']['wall']:.3f}s"
+    print(f"Day {day:<3}{YELLOW}{result['language']}{NC}{timing}")
+    for star in result["stars"]:
+        if "error" in star:
+            print(f"   Star {star['star']} {RED}Failed!{NC}")
+            print(star["error"].rstrip())
+            continue
+        # Without the reset, the peak is the one of the process so far
+        rss = "peak rss" if star["peak_rss_reset"] else "process peak rss"
+        timing = (f"wall {star['wall']:.3f}s, cpu {star['cpu']:.3f}s, "
+                  f"{rss} {star['peak_rss_kb'] // 1024}MB")
+        if star["correct"]:
+            print(f"   Star {star['star']} {GREEN}Correct!{NC}   {timing}")
+        else:
+            print(f"   Star {star['star']} {RED}Incorrect!{NC}   {timing}")
+            print("WANTED")
+            print(star["wanted"])
+            print("____")
+            print("GOT")
+            print(star["got"])
+            print("____")
+##############################MAIN#################################
+def main():
+    """
+    Run every day, or the days given, and check the stars against
+    star1.txt and star2.txt. Every star runs in a worker process of its
+    own, with a timeout, up to jobs at a time. With a single job and
+    --timeout 0 all days run once in this process, without timeouts
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("days",nargs="*",type=int,default=range(1,26),help="days to run")
+    parser.add_argument("--json",help="also write the results and timings to this file")
+    parser.add_argument("--jobs",type=int,default=os.cpu_count() or 1,
+                        help="worker processes, one per core by default")
+    parser.add_argument("--timeout",type=float,default=300,help="seconds per star, 0 for none")
+    args = parser.parse_args()
+
+    found = find_days(args.days)
+    python = [(day,folder) for day,folder,language in found if language == "Python"]
+    # A star can only be stopped at the timeout in a process of its own
+    parallel = args.jobs > 1 or args.timeout > 0
+    if parallel:
+        tasks = [(day,folder,star) for day,folder in python for star in (1,2)]
+        finished = run_parallel(tasks,args.jobs,args.timeout or None)
+    else:
+        finished = (run_day(day,folder) for day,folder in python)
+
+    results = []
+    for day,folder,language in found:
+        if folder is None:
+            print(f"Day {day:<3}{RED}not found!{NC}")
+        elif language == "Python":
+            # Stars come back one by one, wait for both of the day
+            result = next(finished)
+            if parallel:
+                result = merge([result,next(finished)])[0]
+            report(result)
+            results.append(result)
+        elif language == "Haskell":
+            print(f"Day {day} {GREEN}Haskell{NC}")
+        else:
+            print(f"Language in {folder} not implemented!")
+
+    if args.json is not None:
+        with open(args.json,"w") as f:
+            json.dump(results,f,indent=2)
+    return all(star["correct"] for result in results for star in result["stars"])
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)